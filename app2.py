@@ -2,7 +2,26 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+
+import assets
+import calibration
+import charts
+import cycle_sim
+import dataset
+import explorer
+import inventory
+import model
+import profiling
+import sensitivity
+import uncertainty
+
+# Static images are web-sized WebP variants built once (see assets.py). With static serving on, the browser
+# fetches them directly; otherwise they are read once per process and sent through Streamlit.
+@st.cache_resource
+def load_image(path):
+    if st.get_option("server.enableStaticServing"):
+        return assets.url(path)
+    return assets.variant(path).read_bytes()
 
 # Custom CSS to change background color
 st.markdown(
@@ -25,7 +44,13 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Opt-in profiling of this run: wall time per page section (memory is measured by benchmark.py --memory,
+# since tracemalloc would slow down every session on the server)
+show_profiling = st.sidebar.checkbox("Show profiling panel")
+profiler = profiling.Profiler(enabled=show_profiling)
+
 # Section: Explanation of the Model
+profiler.start("Introduction")
 st.title("Methane Emissions in Shrimp Ponds Model")
 
 # Add text to explain the model
@@ -35,23 +60,35 @@ This Streamlit app models methane (CH₄) emissions in shrimp ponds based on sev
 
 st.subheader("What is Methane?")
 st.write("Methane (CH₄) is a potent greenhouse gas (GHG) that is colorless, odorless, and highly efficient at trapping heat in the atmospheric. It is produced naturally in wetlands, as a byproduct of the digestion of certain organisms, and through human activities such as agriculture, fossil fuel extraction, and waste management [1].")
-st.image("image1.png", caption="Figure 1: Methane (CH4)")
-
-st.subheader("What role do livestock and aquaculture play in methane emissions?")
-st.write("Livestock and aquaculture are significant contributors to global emissions of CH₄, CO₂, and N₂O. However, when considering protein production, aquaculture has a lower emission intensity compared to livestock [2]. The relatively low emissions values in aquaculture are primarily due to the lack of enteric methane (CH₄) production and the high fertility and low feed conversion ratios of finfish, crustaceans, and shellfish. This makes aquaculture a more biologically efficient method of producing animal protein compared to terrestrial livestock, especially ruminants [3].")
-st.image("image2.png", caption="Figure 2: World production of capture fisheries, aquaculture and pig, chicken and cattle meat from 1961 to 2017.")
-
-st.subheader("Which aquaculture practices emit the most methane?")
-st.write("Among aquaculture farming practices, GHG emissions vary based on the farming system, water type, species, production intensity, and water parameters. Crustacean and fish pond-based systems are the leading producers of CH₄. In shrimp ponds, CH₄ is mainly produced in the sediment, where organic waste, uneaten feed, and feces accumulate. Under anaerobic conditions, microorganisms in the sediment decompose this organic matter, generating methane as a byproduct [4].")
-st.image("image3.png", caption="Figure 3: Example of shrimp pond.")
-
-st.subheader("Where does methane come from in shrimp (crustacean) ponds?")
-st.write("Methane emissions in aquaculture ponds result from the decomposition of organic matter, including uneaten feed, feces, and decaying phytoplankton and zooplankton, which settle in the pond sediment. Under anaerobic conditions, methanogenic archaea and bacteria convert this organic matter into methane (CH₄), alongside intermediate byproducts such as CO₂, NH₃, and H₂S. Key environmental factors like temperature, dissolved oxygen (DO), pH, salinity, and nitrogen influence microbial activity and the rate of methane production. Methane is released to the atmosphere via diffusion or ebullition, highlighting the importance of aquaculture practices and water quality management in mitigating greenhouse gas emissions.")
-st.image("image7.png", caption="Figure 4: Explanation on methane production and emission in shrimp ponds [5].")
-
-st.subheader("Description of the three crustacean species in this model")
-st.image("image4.png", caption="Figure 5: Whiteleg shrimp.")
-st.write("""
+st.image(load_image("image1.png"), caption="Figure 1: Methane (CH4)")
+
+# Background reading below the fold: each section only runs, and sends its image, once the reader opens it.
+# Opening or closing one reruns just this fragment.
+@st.fragment
+def background_reading():
+    section = st.expander("What role do livestock and aquaculture play in methane emissions?", key="section-livestock", on_change="rerun")
+    if section.open:
+        with section:
+            st.write("Livestock and aquaculture are significant contributors to global emissions of CH₄, CO₂, and N₂O. However, when considering protein production, aquaculture has a lower emission intensity compared to livestock [2]. The relatively low emissions values in aquaculture are primarily due to the lack of enteric methane (CH₄) production and the high fertility and low feed conversion ratios of finfish, crustaceans, and shellfish. This makes aquaculture a more biologically efficient method of producing animal protein compared to terrestrial livestock, especially ruminants [3].")
+            st.image(load_image("image2.png"), caption="Figure 2: World production of capture fisheries, aquaculture and pig, chicken and cattle meat from 1961 to 2017.")
+
+    section = st.expander("Which aquaculture practices emit the most methane?", key="section-practices", on_change="rerun")
+    if section.open:
+        with section:
+            st.write("Among aquaculture farming practices, GHG emissions vary based on the farming system, water type, species, production intensity, and water parameters. Crustacean and fish pond-based systems are the leading producers of CH₄. In shrimp ponds, CH₄ is mainly produced in the sediment, where organic waste, uneaten feed, and feces accumulate. Under anaerobic conditions, microorganisms in the sediment decompose this organic matter, generating methane as a byproduct [4].")
+            st.image(load_image("image3.png"), caption="Figure 3: Example of shrimp pond.")
+
+    section = st.expander("Where does methane come from in shrimp (crustacean) ponds?", key="section-origin", on_change="rerun")
+    if section.open:
+        with section:
+            st.write("Methane emissions in aquaculture ponds result from the decomposition of organic matter, including uneaten feed, feces, and decaying phytoplankton and zooplankton, which settle in the pond sediment. Under anaerobic conditions, methanogenic archaea and bacteria convert this organic matter into methane (CH₄), alongside intermediate byproducts such as CO₂, NH₃, and H₂S. Key environmental factors like temperature, dissolved oxygen (DO), pH, salinity, and nitrogen influence microbial activity and the rate of methane production. Methane is released to the atmosphere via diffusion or ebullition, highlighting the importance of aquaculture practices and water quality management in mitigating greenhouse gas emissions.")
+            st.image(load_image("image7.png"), caption="Figure 4: Explanation on methane production and emission in shrimp ponds [5].")
+
+    section = st.expander("Description of the three crustacean species in this model", key="section-species", on_change="rerun")
+    if section.open:
+        with section:
+            st.image(load_image("image4.png"), caption="Figure 5: Whiteleg shrimp.")
+            st.write("""
 **Species**: *Litopenaeus vannamei*  
 **Common Name**: Whiteleg Shrimp  
 **Origin**: Pacific coast of Latin America  
@@ -61,8 +98,8 @@ st.write("""
 **Important Characteristics**: High adaptability, resilience to various salinities, rapid growth, high feed conversion efficiency, and good meat [8].
 """)
 
-st.image("image5.png", caption="Figure 6: Black tiger shrimp.")
-st.write("""
+            st.image(load_image("image5.png"), caption="Figure 6: Black tiger shrimp.")
+            st.write("""
 **Species**: *Penaeus monodon*  
 **Common Name**: Black Tiger Shrimp  
 **Origin**: Indo-Pacific region  
@@ -72,8 +109,8 @@ st.write("""
 **Important Characteristics**: High disease resistance, robust in high salinity, growth potential, good meat quality, and high market value [7].  
 """)
 
-st.image("image6.png", caption="Figure 7: Chinese Mitten Crab.")
-st.write("""
+            st.image(load_image("image6.png"), caption="Figure 7: Chinese Mitten Crab.")
+            st.write("""
 **Species**: *Eriocheir sinensis*  
 **Common Name**: Chinese Mitten Crab  
 **Origin**: East Asia (China, Korea)  
@@ -83,6 +120,8 @@ st.write("""
 **Important Characteristics**: High market value, adaptability to low salinity, resilience in fluctuating conditions, strong burrowing behavior, quality meat [8].  
 """)
 
+background_reading()
+
 # Environmental Conditions Table
 st.subheader("Environmental Conditions")
 st.write("""Table 1: Ideal water parameters for the crustacean species""")
@@ -121,87 +160,245 @@ st.write("""
 The model calculates methane emissions using a mechanistic function based on these inputs, allowing you to adjust values and observe changes in predicted methane flux.
 """)
 
-# Define methane emission model function
-def methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, TOC, salinity, nitrogen, DO, pH):
-    methane_flux = (
-        alpha 
-        * np.exp(np.clip(beta_1 * temp, -50, 50))          # Temperature effect
-        * (np.clip(TOC, 5, None) ** beta_2)             # TOC effect
-        * (np.clip(salinity, 1e-10, None) ** beta_3)        # Salinity effect
-        * np.exp(np.clip(-beta_4 * nitrogen, -50, 50))      # Nitrogen effect
-        / np.exp(np.clip(beta_5 * DO, -50, 50))             # DO effect (now beta_5 = -0.01)
-        * (np.clip(pH, 1e-10, None) ** beta_6)              # pH effect
+profiler.stop()
+
+# Parameters fitted per species from the dataset (refit only when the workbook changes)
+@st.cache_data
+def load_calibration(version):
+    return calibration.calibrate()
+
+# Plot axis label -> (model driver, sweep range)
+axis_params = {
+    "Temperature": ("temp", 10, 40),
+    "TOC": ("TOC", 5, 30),
+    "Salinity": ("salinity", 1, 40),
+    "Nitrogen": ("nitrogen", 50, 200),
+    "DO": ("DO", 2, 15),
+    "pH": ("pH", 6.0, 9.0),
+}
+
+# Bounded memo of model outputs keyed on the slider inputs, shared by all sessions
+@st.cache_data(max_entries=256)
+def flux_curve(x_axis_param, drivers, params):
+    x_driver, x_min, x_max = axis_params[x_axis_param]
+    x_values = np.linspace(x_min, x_max, 100)
+    return x_values, model.sweep({x_driver: x_values}, drivers, params)
+
+# Response surfaces are memoised as finished figures, since encoding 10^6 cells costs more than computing them
+@st.cache_data(max_entries=16)
+def flux_surface_figure(plot_type, x_axis_param, y_axis_param, resolution, drivers, params):
+    # One broadcast evaluation over the whole grid (resolution² cells)
+    x_driver, x_min, x_max = axis_params[x_axis_param]
+    y_driver, y_min, y_max = axis_params[y_axis_param]
+    x_values = np.linspace(x_min, x_max, resolution)
+    y_values = np.linspace(y_min, y_max, resolution)
+    methane_flux_grid = model.sweep({y_driver: y_values, x_driver: x_values}, drivers, params)
+    return charts.surface_figure(plot_type, x_axis_param, x_values, y_axis_param, y_values, methane_flux_grid)
+
+# Monte Carlo percentile bands, cached per settings so reruns with the same inputs are instant
+@st.cache_data(max_entries=32)
+def uncertainty_bands(x_driver, x_values, drivers, params, param_cov, input_rel_sd, draws, seed):
+    return uncertainty.simulate_bands(x_driver, x_values, drivers, params, param_cov, input_rel_sd, draws, seed=seed)
+
+@st.cache_data(max_entries=16)
+def cycle_scenario(drivers, params, ponds, days, temp_amplitude):
+    series = cycle_sim.scenario_drivers(drivers, ponds, days, temp_amplitude=temp_amplitude)
+    totals, trajectory = cycle_sim.simulate(series, 1.0, params)
+    return totals * model.MG_M2_TO_KG_HA, np.percentile(trajectory, [5, 50, 95], axis=0) * model.MG_M2_TO_KG_HA
+
+@st.cache_data(max_entries=32)
+def driver_sensitivity(species, params, method, samples):
+    ranges = model.SPECIES_RANGES[species]
+    if method == "Sobol":
+        return sensitivity.sobol(ranges, params, samples)
+    return sensitivity.morris(ranges, params, samples)
+
+
+# Section: Interactive model. Fragments re-execute on their own when their widgets change,
+# so moving a slider only recomputes the plots below, not the rest of the page.
+@st.fragment
+def interactive_model():
+    profiler.start("Interactive model")
+    col_inputs, col_plot = st.columns([1, 3])
+
+    # Model parameter inputs (fragments cannot place widgets in the sidebar)
+    with col_inputs:
+        st.subheader("Model Parameters")
+        species = st.selectbox("Species", model.SPECIES)
+        use_calibrated = st.checkbox("Use calibrated parameters", value=True)
+        if use_calibrated:
+            fit = load_calibration(dataset.version())["species"][species]
+            params = fit["params"]
+            with st.expander("Calibrated parameters"):
+                st.dataframe(pd.DataFrame({
+                    "Value": params,
+                    "95% CI": {
+                        name: f"{ci[0]:.4g} – {ci[1]:.4g}" if fit["identified"][name] else "not identified"
+                        for name, ci in fit["ci"].items()
+                    },
+                }))
+                st.caption(f"Fitted to {fit['n_obs']} observations (RMSE of log flux: {fit['rmse_log']:.2f}). Parameters marked not identified have a driver that never varies in this species' data and are kept at their default value.")
+        else:
+            params = model.DEFAULT_PARAMS
+
+        temp = st.slider("Temperature (°C)", 1, 40, 27)
+        TOC = st.slider("Total Organic Carbon (mg/L)", 5, 30, 15)
+        salinity = st.slider("Salinity (ppt)", 1, 40, 10)
+        nitrogen = st.slider("Nitrogen (µg/L)", 50, 2000, 100)
+        DO = st.slider("Dissolved Oxygen (mg/L)", 2, 15, 5)
+        pH = st.slider("pH", 6.0, 9.0, 7.5, step=0.1)
+
+        drivers = {"temp": temp, "TOC": TOC, "salinity": salinity, "nitrogen": nitrogen, "DO": DO, "pH": pH}
+
+        # Choose between the single-parameter curve and two-parameter response surfaces
+        plot_type = st.radio("Plot Type", ["Curve", "Heatmap", "Contour"], horizontal=True)
+
+        # Dropdown to choose the x-axis parameter for the plot
+        x_axis_param = st.selectbox("Select X-axis Parameter", list(axis_params))
+
+        if plot_type == "Curve":
+            show_bands = st.checkbox("Show uncertainty bands")
+            if show_bands:
+                draws = st.select_slider("Monte Carlo draws", [100_000, 1_000_000, 5_000_000], value=1_000_000)
+                input_noise = st.slider("Measurement uncertainty (%)", 0, 30, 5)
+                seed = st.number_input("Random seed", value=0, step=1)
+        else:
+            y_axis_param = st.selectbox("Select Y-axis Parameter", [p for p in axis_params if p != x_axis_param])
+            resolution = st.select_slider("Grid Resolution", [100, 250, 500, 1000], value=500)
+
+    if plot_type == "Curve":
+        # Evaluate the whole curve in one vectorized sweep
+        x_values, methane_flux_values = flux_curve(x_axis_param, drivers, params)
+
+        # Create an interactive plot with Plotly
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=x_values,
+            y=methane_flux_values,
+            mode='lines+markers',
+            name="Methane Flux",
+            marker=dict(size=5),
+            hovertemplate="CH₄ Flux: %{y:.2f} mg CH₄/m²/day<br>" + f"{x_axis_param}: " + "%{x:.2f}<extra></extra>"
+        ))
+
+        # Optional 5/50/95 % bands from sampling the parameters and measurement noise
+        if show_bands:
+            param_cov = uncertainty.parameter_covariance(params, fit["cov"] if use_calibrated else None)
+            with st.spinner("Sampling..."):
+                low, median, high = uncertainty_bands(axis_params[x_axis_param][0], x_values, drivers, params, param_cov, input_noise / 100, draws, int(seed))
+            fig.add_trace(go.Scatter(x=x_values, y=high, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(
+                x=x_values, y=low, mode='lines', line=dict(width=0), fill='tonexty',
+                fillcolor='rgba(0, 121, 107, 0.2)', name="5–95% band", hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=x_values, y=median, mode='lines', line=dict(dash='dash', color='#00796B'), name="Median",
+                hovertemplate="Median: %{y:.2f} mg CH₄/m²/day<extra></extra>"
+            ))
+
+        # Customize the layout
+        fig.update_layout(
+            title=f"Effect of {x_axis_param} on Methane Flux",
+            xaxis_title=x_axis_param,
+            yaxis_title="Methane Flux (mg CH₄/m²/day)",
+            hovermode="x unified"
+        )
+    else:
+        fig = flux_surface_figure(plot_type, x_axis_param, y_axis_param, resolution, drivers, params)
+
+    # Display the plot in Streamlit
+    with col_plot:
+        st.plotly_chart(fig)
+        timing = st.empty()
+
+    # The nested fragments rerun with every slider move too, so they count towards its latency
+    production_cycle(species, drivers, params)
+    driver_ranking(species, params)
+    profiler.stop()
+    if show_profiling:
+        timing.caption(f"Slider move (model, production cycle and driver ranking): {profiler.records['Interactive model']['wall_ms']:.1f} ms")
+
+
+# Section: Cumulative emissions over a production cycle
+@st.fragment
+def production_cycle(species, drivers, params):
+    profiler.start("Production cycle")
+    st.subheader("Emissions over a production cycle")
+    st.write("The model predicts an instantaneous flux. To estimate what a crop emits, the flux is integrated day by day over the production cycle for a group of ponds whose water parameters vary around the values selected above, with a seasonal swing in temperature.")
+
+    cycle_min, cycle_max = model.SPECIES_CYCLE_DAYS[species]
+    col1, col2, col3 = st.columns(3)
+    cycle_days = col1.slider("Production cycle (days)", cycle_min, cycle_max, (cycle_min + cycle_max) // 2)
+    ponds = col2.select_slider("Number of ponds", [1, 10, 100, 1_000, 10_000], value=1_000)
+    temp_amplitude = col3.slider("Seasonal temperature swing (°C)", 0.0, 8.0, 3.0, step=0.5)
+
+    cycle_totals, cycle_bands = cycle_scenario(drivers, params, ponds, cycle_days, temp_amplitude)
+    days = np.arange(1, cycle_days + 1)
+
+    fig_cycle = go.Figure()
+    fig_cycle.add_trace(go.Scatter(x=days, y=cycle_bands[2], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig_cycle.add_trace(go.Scatter(
+        x=days, y=cycle_bands[0], mode='lines', line=dict(width=0), fill='tonexty',
+        fillcolor='rgba(0, 121, 107, 0.2)', name="5–95% of ponds", hoverinfo='skip'
+    ))
+    fig_cycle.add_trace(go.Scatter(
+        x=days, y=cycle_bands[1], mode='lines', line=dict(color='#00796B'), name="Median pond",
+        hovertemplate="Day %{x}: %{y:.2f} kg CH₄/ha<extra></extra>"
+    ))
+    fig_cycle.update_layout(
+        title=f"Cumulative CH₄ emissions over a {cycle_days}-day cycle ({species})",
+        xaxis_title="Day of cycle",
+        yaxis_title="Cumulative CH₄ (kg/ha)",
     )
-    return methane_flux
+    st.plotly_chart(fig_cycle)
 
-# Set default model parameters
-alpha = 1.0
-beta_1 = 0.1
-beta_2 = 1.0
-beta_3 = -0.5
-beta_4 = 0.01
-beta_5 = -0.01  # Updated to -0.01 as specified
-beta_6 = 0.05
+    st.write(f"Median emission per cycle: **{np.median(cycle_totals):.2f} kg CH₄/ha** (5–95% of ponds: {np.percentile(cycle_totals, 5):.2f}–{np.percentile(cycle_totals, 95):.2f} kg CH₄/ha).")
+    profiler.stop()
 
-# Streamlit interface
-st.title("Methane Emissions in Shrimp Ponds Model")
 
-# Sidebar for model parameter inputs
-st.sidebar.header("Model Parameters")
-temp = st.sidebar.slider("Temperature (°C)", 1, 40, 27)
-TOC = st.sidebar.slider("Total Organic Carbon (mg/L)", 5, 30, 15)
-salinity = st.sidebar.slider("Salinity (ppt)", 1, 40, 10)
-nitrogen = st.sidebar.slider("Nitrogen (µg/L)", 50, 2000, 100)
-DO = st.sidebar.slider("Dissolved Oxygen (mg/L)", 2, 15, 5)
-pH = st.sidebar.slider("pH", 6.0, 9.0, 7.5, step=0.1)
-
-# Dropdown to choose the x-axis parameter for the plot
-x_axis_param = st.sidebar.selectbox("Select X-axis Parameter", ["Temperature", "TOC", "Salinity", "Nitrogen", "DO", "pH"])
-
-# Set up the x-axis data based on the selected parameter
-if x_axis_param == "Temperature":
-    x_values = np.linspace(10, 40, 100)
-    methane_flux_values = [methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, x, TOC, salinity, nitrogen, DO, pH) for x in x_values]
-elif x_axis_param == "TOC":
-    x_values = np.linspace(5, 30, 100)
-    methane_flux_values = [methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, x, salinity, nitrogen, DO, pH) for x in x_values]
-elif x_axis_param == "Salinity":
-    x_values = np.linspace(1, 40, 100)
-    methane_flux_values = [methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, TOC, x, nitrogen, DO, pH) for x in x_values]
-elif x_axis_param == "Nitrogen":
-    x_values = np.linspace(50, 200, 100)
-    methane_flux_values = [methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, TOC, salinity, x, DO, pH) for x in x_values]
-elif x_axis_param == "DO":
-    x_values = np.linspace(2, 15, 100)
-    methane_flux_values = [methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, TOC, salinity, nitrogen, x, pH) for x in x_values]
-elif x_axis_param == "pH":
-    x_values = np.linspace(6.0, 9.0, 100)
-    methane_flux_values = [methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, TOC, salinity, nitrogen, DO, x) for x in x_values]
-
-# Create an interactive plot with Plotly
-fig = go.Figure()
-
-fig.add_trace(go.Scatter(
-    x=x_values,
-    y=methane_flux_values,
-    mode='lines+markers',
-    name="Methane Flux",
-    marker=dict(size=5),
-    hovertemplate="CH₄ Flux: %{y:.2f} mg CH₄/m²/day<br>" + f"{x_axis_param}: " + "%{x:.2f}<extra></extra>"
-))
-
-# Customize the layout
-fig.update_layout(
-    title=f"Effect of {x_axis_param} on Methane Flux",
-    xaxis_title=x_axis_param,
-    yaxis_title="Methane Flux (mg CH₄/m²/day)",
-    hovermode="x unified"
-)
+# Section: Global sensitivity of the flux to the drivers
+@st.fragment
+def driver_ranking(species, params):
+    profiler.start("Sensitivity ranking")
+    st.subheader("Which water parameters matter most?")
+    st.write(f"Instead of varying one parameter at a time, the ranking below varies all six together across the ideal ranges for *{species}* (Table 1). Sobol indices give the share of the variance in CH₄ flux explained by each parameter alone (first-order) and including its interactions with the others (total). Morris screening is a cheaper approximation that ranks the parameters by their average effect.")
 
-# Display the plot in Streamlit
-st.plotly_chart(fig)
+    col1, col2 = st.columns(2)
+    method = col1.radio("Method", ["Sobol", "Morris"], horizontal=True)
+    if method == "Sobol":
+        samples = col2.select_slider("Base samples", [10_000, 100_000, 1_000_000], value=100_000)
+    else:
+        samples = col2.select_slider("Trajectories", [100, 1_000, 10_000], value=1_000)
+
+    ranking = driver_sensitivity(species, params, method, samples)
+    labels = {driver: label for label, (driver, _, _) in axis_params.items()}
+    ranking = ranking.rename(index=labels)
+    if method == "Sobol":
+        ranking = ranking.sort_values("ST")
+        fig_sens = go.Figure([
+            go.Bar(y=ranking.index, x=ranking["S1"], orientation='h', name="First-order"),
+            go.Bar(y=ranking.index, x=ranking["ST"], orientation='h', name="Total"),
+        ])
+        fig_sens.update_layout(barmode='group', xaxis_title="Sobol index")
+    else:
+        ranking = ranking.sort_values("mu_star")
+        fig_sens = go.Figure(go.Bar(
+            y=ranking.index, x=ranking["mu_star"], orientation='h', name="μ*",
+            error_x=dict(type='data', array=ranking["sigma"])
+        ))
+        fig_sens.update_layout(xaxis_title="Mean absolute effect μ* (mg CH₄/m²/day)")
+    fig_sens.update_layout(title=f"Sensitivity of CH₄ flux to water parameters ({species})")
+    st.plotly_chart(fig_sens)
+    profiler.stop()
+
+
+# Streamlit interface
+st.title("Methane Emissions in Shrimp Ponds Model")
+interactive_model()
 
 # Title and Description
+profiler.start("Model overview")
 st.title("Methane Emissions Model Overview")
 
 # Section: Model Equation and Variables
@@ -224,7 +421,10 @@ Each variable reflects environmental conditions impacting microbial metabolism a
 
 """)
 
+profiler.stop()
+
 # Section: Dataset Origin and Details
+profiler.start("Dataset analytics")
 st.title("This section provides insights into the dataset used in the methane emission model. ")
 st.subheader("Dataset Origin and Composition")
 st.write("The dataset used in this model analysis was compiled from a variety of sources to provide comprehensive methane emission data across aquaculture studies. Here are key details:")
@@ -243,66 +443,136 @@ This dataset reflects data from various regions and species, allowing for a robu
 
 st.write("Explore the distribution of studies across countries and analyze the annual trsnds in study counts.")
 
-# Load dataset from the Excel file directly
-data_file = 'DataModels.xlsx'
-sheet_name = 'ArticleInfo' 
+# Categorical indexes over one sheet, built once per data version and shared by all sessions
+@st.cache_resource
+def load_explorer(sheet_name, version):
+    return explorer.Explorer(dataset.load_sheet(sheet_name))
+
+# Filters, charts and references rerun on their own when a filter changes
+@st.fragment
+def dataset_explorer(version):
+    sheet_name = st.radio(
+        "Sheet", ["ArticleInfo", "AllAqua", "Data"], horizontal=True,
+        help="ArticleInfo has one row per article; AllAqua and Data have one row per reported measurement."
+    )
+    data = load_explorer(sheet_name, version)
+
+    filter_labels = {"species": "Species", "country": "Country", "year": "Year", "system": "System type"}
+    filters = {
+        name: column.multiselect(label, data.options(name), key=f"filter-{sheet_name}-{name}")
+        for column, (name, label) in zip(st.columns(len(filter_labels)), filter_labels.items())
+    }
+    matches = int(data.mask(filters).sum())
+    st.caption(f"{matches:,} of {data.rows:,} rows match the filters.")
+    if not matches:
+        st.info("No rows match these filters.")
+        return
+
+    # Plot a world map with a heatmap indicating the number of studies per country
+    country_counts = data.aggregate("country", filters)["studies"].rename("Count").reset_index()
+    st.subheader("Global Distribution of Studies by Country")
+    st.plotly_chart(charts.studies_by_country(country_counts))
+
+    # Plot a bar plot for the number of studies by year
+    year_counts = data.aggregate("year", filters)["studies"].rename("Count").reset_index()
+    st.subheader("Number of Studies by Year")
+    st.plotly_chart(charts.studies_by_year(year_counts))
+
+    # Observed flux against one driver, thinned on the server for large selections
+    st.subheader("Observed CH₄ Flux by Driver")
+    driver_label = st.selectbox("Driver", list(axis_params), key="explorer-driver")
+    driver = axis_params[driver_label][0]
+    points = data.scatter(driver, filters)
+    if len(points):
+        st.plotly_chart(charts.flux_scatter(points, driver, driver_label))
+    else:
+        st.info(f"No matching rows report both {driver_label} and CH₄ flux.")
+
+    # References Section
+    st.subheader("References of the Dataset")
+    with st.expander("Click here to view the list of DOI references"):
+        for doi in data.references(filters):
+            st.write(doi)
+
 try:
-    data = pd.read_excel(data_file)
-    sheet_name = 'ArticleInfo' 
+    dataset_explorer(dataset.version())
+except FileNotFoundError:
+    st.error("The file 'DataModels.xlsx' was not found. Please check the file path and make sure it's available.")
+
+
+profiler.stop()
 
-    # Ensure data is a DataFrame and check for correct column names
-    if not isinstance(data, pd.DataFrame):
-        st.error("Data was not loaded as a DataFrame. Check the file path and format.")
+# Section: National Emission Inventory
+profiler.start("Emission inventory")
+
+# Every country × species × scenario in one vectorized evaluation, recomputed only when the data,
+# the assumptions or the parameters change; switching scenario just reads the cached table
+@st.cache_data(max_entries=16)
+def emission_inventory(version, production, assumptions, use_calibrated):
+    if use_calibrated:
+        params = {species: fit["params"] for species, fit in load_calibration(version)["species"].items()}
     else:
-        # Check if the necessary columns exist
-        required_columns = ['Country', 'Year', 'DOI']
-        if not all(column in data.columns for column in required_columns):
-            st.error("One or more required columns are missing in the dataset.")
-        else:
-            # Count the number of studies per country
-            country_counts = data['Country'].value_counts().reset_index()
-            country_counts.columns = ['Country', 'Count']
-
-            # Count the number of studies per year
-            year_counts = data['Year'].value_counts().sort_index().reset_index()
-            year_counts.columns = ['Year', 'Count']
-
-            # Plot a world map with a heatmap indicating the number of studies per country
-            st.subheader("Global Distribution of Studies by Country")
-            fig_country = px.choropleth(
-                country_counts,
-                locations="Country",
-                locationmode="country names",
-                color="Count",
-                hover_name="Country",
-                color_continuous_scale="Viridis",
-            )
-            fig_country.update_geos(showcoastlines=True, coastlinecolor="Black", showland=True, landcolor="lightgrey")
-            fig_country.update_layout(coloraxis_colorbar=dict(title="Number of Studies"))
-            st.plotly_chart(fig_country)
-
-            # Plot a bar plot for the number of studies by year
-            st.subheader("Number of Studies by Year")
-            fig_year = px.bar(
-                year_counts,
-                x='Year',
-                y='Count',
-                labels={'Count': 'Number of Studies', 'Year': 'Year'}
-            )
-            st.plotly_chart(fig_year)
-
-            # References Section
-            st.subheader("References of the Dataset")
-            unique_dois = data['DOI'].drop_duplicates().dropna()  # Remove duplicates and NaN values
-            with st.expander("Click here to view the list of DOI references"):
-                for doi in unique_dois:
-                    st.write(doi)
+        params = {species: model.DEFAULT_PARAMS for species in model.SPECIES}
+    return inventory.inventory(production, assumptions, params=params)
+
+@st.fragment
+def emission_inventory_section(version):
+    st.title("National Emission Inventory")
+    st.write("This section scales the model's per-area flux to national totals: production is converted to pond area with the stocking assumptions below, and pond conditions are the medians reported for each country in the ProdCrust sheet. Drivers a country has no data for are filled as in the calibration, with the species median of the observations the parameters were fitted on (or the middle of the species' ideal range if none were reported); the table lists the imputed drivers of each row. The default production splits each species' 2023 total equally among its top three producers; edit the table to use national statistics.")
+
+    with st.expander("Production and farming assumptions"):
+        production = st.data_editor(
+            inventory.PRODUCTION, num_rows="dynamic", key="inventory-production",
+            column_config={
+                "Species": st.column_config.SelectboxColumn(options=list(model.SPECIES), required=True),
+                "tonnes": st.column_config.NumberColumn("Production (t/year)", min_value=0, format="%.0f"),
+            }
+        )
+        assumptions = st.data_editor(
+            inventory.ASSUMPTIONS, key="inventory-assumptions",
+            column_config={
+                "stocking_density": st.column_config.NumberColumn("Stocking (animals/m²)", min_value=0.01),
+                "survival": st.column_config.NumberColumn("Survival", min_value=0.01, max_value=1.0),
+                "harvest_weight_g": st.column_config.NumberColumn("Harvest weight (g)", min_value=0.1),
+                "cycles_per_year": st.column_config.NumberColumn("Cycles per year", min_value=0.1),
+            }
+        )
+        use_calibrated = st.checkbox("Use calibrated parameters", value=True, key="inventory-calibrated")
+
+    production = production.dropna()
+    if production.empty:
+        st.info("Add at least one complete row to the production table to compute the inventory.")
+        return
+    table = emission_inventory(version, production, assumptions, use_calibrated)
+    totals = inventory.national_totals(table)
+
+    scenario = st.selectbox("Scenario", list(inventory.SCENARIOS), key="inventory-scenario")
+    st.subheader("Methane Emissions by Country")
+    st.plotly_chart(charts.emissions_by_country(totals[scenario].rename("emission_t").reset_index()))
+    total = totals[scenario].sum()
+    current = totals[list(inventory.SCENARIOS)[0]].sum()
+    change = f" ({total / current - 1:+.0%} versus current practice)" if scenario != list(inventory.SCENARIOS)[0] else ""
+    st.write(f"Total: **{total:,.0f} t CH₄/year**{change}.")
+
+    st.subheader("Scenario Comparison")
+    st.plotly_chart(charts.emissions_by_scenario(totals))
+    st.dataframe(
+        table.loc[table["Scenario"] == scenario, ["Country", "Species", "tonnes", "area_ha", "flux", "emission_t", "intensity", "imputed"]].rename(columns={
+            "tonnes": "Production (t/year)", "area_ha": "Pond area (ha)", "flux": "CH₄ flux (mg/m²/day)",
+            "emission_t": "Emission (t CH₄/year)", "intensity": "kg CH₄ per t produced", "imputed": "Imputed drivers",
+        }),
+        hide_index=True,
+    )
 
+try:
+    emission_inventory_section(dataset.version())
 except FileNotFoundError:
     st.error("The file 'DataModels.xlsx' was not found. Please check the file path and make sure it's available.")
 
+profiler.stop()
 
 # References with smaller font size
+profiler.start("References and footer")
 st.markdown("""
 <div class="reference-text">
 
@@ -340,10 +610,16 @@ st.markdown("""
 col1, col2, col3 = st.columns([1, 1, 1])
 
 with col1:
-    st.image("logo1.png", caption="University of Guelph", use_container_width=True)
+    st.image(load_image("logo1.png"), caption="University of Guelph", width="stretch")
 
 with col2:
-    st.image("logo2.png", caption="Department of Animal Biosciences", use_container_width=True)
+    st.image(load_image("logo2.png"), caption="Department of Animal Biosciences", width="stretch")
 
 with col3:
-    st.image("logo3.png", caption="Centre for Nutrition Modelling", use_container_width=True)
+    st.image(load_image("logo3.png"), caption="Centre for Nutrition Modelling", width="stretch")
+profiler.stop()
+
+if show_profiling:
+    with st.sidebar.expander("Profiling", expanded=True):
+        st.dataframe(profiler.table().round(2))
+        st.caption("Wall time per section for the last full rerun. Slider changes rerun only the model sections; their time is shown under the plot.")
@@ -0,0 +1,103 @@
+"""Web-sized WebP variants of the page images, built once per source image.
+
+Each source PNG is downscaled to the width it is displayed at (never upscaled)
+and re-encoded as WebP. Variants are written to ``static/assets`` with the
+source's SHA-256 and the build settings in the file name, so an image is only
+re-encoded when it or the settings change. If the WebP would be larger than
+the source (tiny palette logos), the source bytes are kept.
+
+The app links the variants through Streamlit's static file serving
+(``server.enableStaticServing`` in .streamlit/config.toml), so the browser
+fetches and caches the files directly instead of Streamlit re-encoding the
+image on every rerun.
+
+Example:
+    python assets.py          # build every variant ahead of deployment
+"""
+
+import argparse
+import hashlib
+import io
+from pathlib import Path
+
+from PIL import Image
+
+import dataset
+
+# Served by Streamlit at /app/static/ when static serving is enabled
+STATIC_DIR = Path(__file__).with_name("static") / "assets"
+STATIC_URL = "/app/static/assets/"
+
+# Bump when the encoding changes so old variants are not reused
+ASSET_VERSION = 1
+
+WEBP_QUALITY = 80
+
+# Displayed width in CSS pixels: the main column of the centered layout, and one of the three logo columns
+CONTENT_WIDTH = 704
+LOGO_WIDTH = 240
+
+SOURCES = {
+    **{f"image{i}.png": CONTENT_WIDTH for i in range(1, 8)},
+    **{f"logo{i}.png": LOGO_WIDTH for i in range(1, 4)},
+}
+
+
+def _encode(source, width):
+    with Image.open(io.BytesIO(source)) as image:
+        image = image.convert("RGBA" if image.mode in ("P", "LA", "RGBA") else "RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+    return out.getvalue()
+
+
+def variant(path, width=None):
+    """Path of the web-sized variant of the image at ``path``, building it if needed."""
+    path = Path(path)
+    width = width or SOURCES.get(path.name, CONTENT_WIDTH)
+    source = path.read_bytes()
+    sha256 = hashlib.sha256(source).hexdigest()
+    for suffix in (".webp", path.suffix):
+        cached = STATIC_DIR / f"{path.stem}-v{ASSET_VERSION}-{sha256[:16]}-{width}w{suffix}"
+        if cached.exists():
+            return cached
+
+    encoded = _encode(source, width)
+    if len(encoded) >= len(source):
+        encoded, cached = source, cached.with_suffix(path.suffix)
+    else:
+        cached = cached.with_suffix(".webp")
+    dataset.atomic_write(cached, lambda tmp: Path(tmp).write_bytes(encoded))
+    return cached
+
+
+def url(path, width=None):
+    """Static-serving URL of the web-sized variant of the image at ``path``."""
+    return STATIC_URL + variant(path, width).name
+
+
+def build(directory=None):
+    """Build the variant of every page image; returns ``{source: variant_path}``."""
+    directory = Path(directory or Path(__file__).parent)
+    return {name: variant(directory / name, width) for name, width in SOURCES.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=None, help="folder with the source images (default: next to this file)")
+    args = parser.parse_args(argv)
+
+    directory = Path(args.directory or Path(__file__).parent)
+    total_source = total_variant = 0
+    for name, built in build(directory).items():
+        source_size, variant_size = (directory / name).stat().st_size, built.stat().st_size
+        total_source += source_size
+        total_variant += variant_size
+        print(f"{name:12} {source_size / 1024:8.1f} KB -> {variant_size / 1024:7.1f} KB  {built.name}")
+    print(f"{'total':12} {total_source / 1024:8.1f} KB -> {total_variant / 1024:7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
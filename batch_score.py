@@ -0,0 +1,214 @@
+"""Score pond sensor logs with the methane emission model from the command line.
+
+Reads a CSV or Parquet file in fixed-size chunks, scores each chunk with
+model.methane_emission_model (vectorized) across a pool of worker processes,
+and appends the predictions to the output file as chunks complete, in input
+order. Only a bounded number of chunks is in flight at any time, so memory
+use does not grow with the size of the input.
+
+Like the app, the CLI scores with the calibrated parameters of ``--species``
+(default: the app's first species); ``--default-params`` uses the defaults.
+
+Example:
+    python batch_score.py sensors.parquet predictions.csv --column temp=Temperature --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import model
+
+OUTPUT_COLUMN = "methane_flux"
+
+
+def read_chunks(path, chunk_size, columns=None):
+    """Yield DataFrames of at most ``chunk_size`` rows from a CSV or Parquet file."""
+    if Path(path).suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+
+
+def input_columns(path):
+    """Column names of a CSV or Parquet file, read from its header or schema only."""
+    if Path(path).suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+class ChunkWriter:
+    """Append DataFrames to a CSV or Parquet file one chunk at a time."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.parquet = self.path.suffix.lower() == ".parquet"
+        self._writer = None
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            elif not table.schema.equals(self._writer.schema):
+                # CSV chunks infer their dtypes independently (an int column gains a NaN, ...)
+                table = self._cast(table)
+            self._writer.write_table(table)
+        else:
+            self.write_csv(list(frame.columns), encode_csv(frame))
+
+    def _cast(self, table):
+        """``table`` in the schema of the first chunk, which the Parquet file was opened with."""
+        import pyarrow as pa
+
+        schema = self._writer.schema
+        if table.schema.names != schema.names:
+            raise ValueError(f"{self.path}: chunk columns {table.schema.names} differ from {schema.names}")
+        columns = []
+        for field, column in zip(schema, table.columns):
+            try:
+                columns.append(column.cast(field.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+                raise ValueError(
+                    f"{self.path}: column '{field.name}' was read as {field.type} but a later chunk has "
+                    f"{column.type} values that do not convert ({error}); write to CSV or give the column one type"
+                ) from None
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def write_csv(self, columns, text):
+        """Append rows that were already encoded with encode_csv()."""
+        if self._writer is None:
+            self._writer = open(self.path, "w", newline="")
+            pd.DataFrame(columns=columns).to_csv(self._writer, index=False)
+        self._writer.write(text)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def encode_csv(frame):
+    return frame.to_csv(header=False, index=False)
+
+
+def score_chunk(frame, columns, params=None):
+    """Return ``frame`` with the predicted flux appended; ``columns`` maps model drivers to frame columns."""
+    drivers = {name: frame[column].to_numpy(dtype=float) for name, column in columns.items()}
+    return frame.assign(**{OUTPUT_COLUMN: model.predict(drivers, params)})
+
+
+def _score_encoded(frame, columns, params, csv):
+    # Runs in the worker: CSV formatting is slower than the model itself, so do it here too
+    scored = score_chunk(frame, columns, params)
+    return len(scored), (list(scored.columns), encode_csv(scored)) if csv else scored
+
+
+def _scored_chunks(chunks, columns, params, workers, csv):
+    if workers == 1:
+        for chunk in chunks:
+            yield _score_encoded(chunk, columns, params, csv)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep at most two chunks per worker queued; collect in submission order
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_encoded, chunk, columns, params, csv))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_file(source, destination, columns=None, params=None, chunk_size=100_000, workers=None, progress=None):
+    """Score ``source`` into ``destination`` and return the number of rows written."""
+    columns = {name: name for name in model.DRIVERS} | dict(columns or {})
+    workers = workers or os.cpu_count() or 1
+    rows = 0
+    with ChunkWriter(destination) as writer:
+        for count, payload in _scored_chunks(read_chunks(source, chunk_size), columns, params, workers, not writer.parquet):
+            if writer.parquet:
+                writer.write(payload)
+            else:
+                writer.write_csv(*payload)
+            rows += count
+            if progress:
+                progress(rows)
+    return rows
+
+
+def _key_value(text):
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{text}'")
+    return key, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV or Parquet file with one row per sensor reading")
+    parser.add_argument("output", help="CSV or Parquet file to write (format follows the extension)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per chunk (default: 100000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        "--column", type=_key_value, action="append", default=[], metavar="DRIVER=COLUMN",
+        help=f"read model driver from a differently named column; drivers: {', '.join(model.DRIVERS)}",
+    )
+    parser.add_argument("--species", choices=model.SPECIES, default=model.SPECIES[0], help="score with this species' calibrated parameters")
+    parser.add_argument("--default-params", action="store_true", help="use the default instead of the calibrated parameters")
+    args = parser.parse_args(argv)
+
+    columns = dict(args.column)
+    unknown = set(columns) - set(model.DRIVERS)
+    if unknown:
+        parser.error(f"unknown driver(s): {', '.join(sorted(unknown))}")
+    # Check the mapping against the header before any worker starts
+    try:
+        available = set(input_columns(args.input))
+    except FileNotFoundError:
+        parser.error(f"input file not found: {args.input}")
+    columns = {name: name for name in model.DRIVERS} | columns
+    missing = [f"{column} ({name})" if column != name else column for name, column in columns.items() if column not in available]
+    if missing:
+        parser.error(f"column(s) not in {args.input}: {', '.join(missing)}; map drivers with --column DRIVER=COLUMN")
+
+    if args.default_params:
+        params = model.DEFAULT_PARAMS
+    else:
+        import calibration
+
+        params = calibration.fitted_params(args.species)
+
+    start = time.perf_counter()
+
+    def report(rows):
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows:,} rows  {rows / elapsed:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    rows = score_file(args.input, args.output, columns, params, chunk_size=args.chunk_size, workers=args.workers, progress=report)
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {rows:,} rows in {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
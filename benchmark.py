@@ -0,0 +1,198 @@
+"""Benchmarks for the model, dataset loading, sweeps, the inventory and figure building.
+
+Each case is timed ``--repeat`` times after one warm-up call and the best time
+is kept. ``--save`` stores the results as the baseline; ``--compare`` checks a
+run against that baseline and exits with status 1 when any case is slower than
+``--tolerance`` × its baseline time. Baselines are machine-specific: save one
+on the machine you compare on.
+
+``--memory`` also reports the peak memory of each case, measured in a separate
+untimed call because tracemalloc slows allocation down.
+
+Example:
+    python benchmark.py --save
+    python benchmark.py --compare --filter predict
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import calibration
+import charts
+import dataset
+import explorer
+import inventory
+import model
+import profiling
+
+BASELINE_FILE = Path(__file__).parent / "benchmark_baseline.json"
+
+
+def _random_drivers(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ranges = model.SPECIES_RANGES[model.SPECIES[0]]
+    return {name: rng.uniform(*ranges[name], rows) for name in model.DRIVERS}
+
+
+def _fixed_drivers():
+    return {name: float(np.mean(model.SPECIES_RANGES[model.SPECIES[0]][name])) for name in model.DRIVERS}
+
+
+def _study_counts():
+    data = explorer.Explorer(dataset.load_sheet("ArticleInfo"))
+    country_counts = data.aggregate("country")["studies"].rename("Count").reset_index()
+    year_counts = data.aggregate("year")["studies"].rename("Count").reset_index()
+    return country_counts, year_counts
+
+
+def _uncached_aggregate(data, filters):
+    data._mask.cache_clear()
+    data._aggregate.cache_clear()
+    return data.aggregate("country", filters), data.aggregate("year", filters)
+
+
+def _cold_load():
+    # A fresh cache directory forces the Excel parse and Parquet write
+    with tempfile.TemporaryDirectory() as directory:
+        previous = dataset.CACHE_DIR
+        dataset.CACHE_DIR = Path(directory)
+        try:
+            dataset.load_workbook()
+        finally:
+            dataset.CACHE_DIR = previous
+
+
+def cases():
+    """Benchmark name -> zero-argument callable."""
+    found = {}
+    for rows in (1, 1_000, 100_000, 1_000_000):
+        drivers = _random_drivers(rows)
+        found[f"predict[{rows}]"] = lambda drivers=drivers: model.predict(drivers)
+
+    fixed = _fixed_drivers()
+    curve = np.linspace(1, 40, 500)
+    axis = np.linspace(1, 40, 1_000)
+    found["sweep[500]"] = lambda: model.sweep({"temp": curve}, fixed)
+    found["sweep[1000x1000]"] = lambda: model.sweep({"TOC": axis, "temp": axis}, fixed)
+
+    dataset.load_workbook()
+    found["load_sheet[warm]"] = lambda: dataset.load_sheet("AllAqua")
+    found["load_workbook[cold]"] = _cold_load
+
+    # The AllAqua sheet repeated to a million rows, to check that filtering stays interactive at scale
+    frame = dataset.load_sheet("AllAqua")
+    large = pd.concat([frame] * (1_000_000 // len(frame) + 1), ignore_index=True)
+    found["explorer[build 1M rows]"] = lambda: explorer.Explorer(large)
+    data = explorer.Explorer(large)
+    filters = {"country": ["China", "India"], "system": ["Ponds"]}
+    found["explorer[filter+aggregate 1M rows]"] = lambda: _uncached_aggregate(data, filters)
+    found["explorer[scatter 1M rows]"] = lambda: data.scatter("temp", filters)
+
+    conditions = inventory.pond_conditions()
+    fills = {species: calibration.fill_values(species) for species in model.SPECIES}
+    params = {species: model.DEFAULT_PARAMS for species in model.SPECIES}
+    found["inventory[all scenarios]"] = lambda: inventory.national_totals(
+        inventory.inventory(params=params, conditions=conditions, fills=fills)
+    )
+
+    country_counts, year_counts = _study_counts()
+    found["figure[choropleth]"] = lambda: charts.studies_by_country(country_counts).to_plotly_json()
+    found["figure[bar]"] = lambda: charts.studies_by_year(year_counts).to_plotly_json()
+    grid = model.sweep({"TOC": axis, "temp": axis}, fixed)
+    for plot_type in ("Heatmap", "Contour"):
+        found[f"figure[{plot_type.lower()} 1000x1000]"] = (
+            lambda plot_type=plot_type: charts.surface_figure(plot_type, "Temperature", axis, "TOC", axis, grid).to_plotly_json()
+        )
+    return found
+
+
+def measure(function, repeat):
+    """Best of ``repeat`` wall times in seconds, after one warm-up call.
+
+    As in timeit, the garbage collector is off while timing, so one case's
+    timings do not depend on how many objects the other cases keep alive.
+    """
+    function()
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(times)
+
+
+def peak_memory(function):
+    """Peak memory allocated by one call, in MB (tracemalloc, so it slows the call down)."""
+    profiler = profiling.Profiler(memory=True)
+    with profiler.section("case"):
+        function()
+    return profiler.records["case"]["peak_mb"]
+
+
+def compare(results, baseline, tolerance):
+    """Names of the cases slower than ``tolerance`` × their baseline time."""
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:36} {seconds * 1000:10.2f} ms   (no baseline)")
+            continue
+        ratio = seconds / reference
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print(f"{name:36} {seconds * 1000:10.2f} ms   {ratio:5.2f}x baseline {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case; the best is kept (default: 5)")
+    parser.add_argument("--save", action="store_true", help=f"write the results to {BASELINE_FILE.name}")
+    parser.add_argument("--compare", action="store_true", help=f"compare against {BASELINE_FILE.name}")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown factor counted as a regression (default: 1.5)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--memory", action="store_true", help="also report the peak memory of one call per case")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, function in cases().items():
+        if args.filter in name:
+            results[name] = measure(function, args.repeat)
+            if not args.compare:
+                memory = f" {peak_memory(function):10.1f} MB peak" if args.memory else ""
+                print(f"{name:36} {results[name] * 1000:10.2f} ms{memory}")
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+    if args.save:
+        previous = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+        payload = {
+            "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count()},
+            "results": {**previous, **results},
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"Saved {len(results)} result(s) to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Fit α and β₁–β₆ per species from the observations in DataModels.xlsx.
+
+Taking logs turns the model into a linear one,
+
+    log(flux) = log α + β₁·Temp + β₂·log TOC + β₃·log Salinity − β₄·N − β₅·DO + β₆·log pH,
+
+so its Jacobian with respect to (log α, β₁ … β₆) is simply the design matrix
+built below and the fit is a closed-form least-squares solve. The field data
+are sparse (most rows report only a few drivers), so missing drivers are filled
+with the species median and the slopes are ridge-penalised towards the default
+parameters; a slope that the data cannot identify stays at its default.
+
+Confidence intervals come from a case-resampling bootstrap: every replicate
+is a batched solve, and batches are spread over worker processes. The
+covariance of the bootstrap draws (with α on the log scale) is stored with the
+fit, because log α and the slopes are strongly correlated when the drivers are
+not centred; uncertainty.py samples the parameters jointly from it.
+
+Fits are stored in .cache/calibration/ under the data version, FIT_VERSION
+and the bootstrap settings (replicates and seed), so the app only refits when
+the workbook or the method changes, and a fit with other settings never stands
+in for the one asked for.
+
+Example:
+    python calibration.py --bootstrap 5000 --workers 4
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import model
+
+# Bump when the fitting method changes so stale cached fits are not reused
+FIT_VERSION = 3
+
+CACHE_DIR = dataset.CACHE_DIR.parent / "calibration"
+
+SHEETS = ("Data", "Crustacea")
+
+# Strength of the ridge penalty on the standardised slopes
+RIDGE = 1.0
+
+
+def load_observations(species):
+    """Observed CH₄ fluxes and drivers for ``species``, one row per unique measurement."""
+    frames = []
+    for sheet in SHEETS:
+        frame = dataset.load_sheet(sheet)
+        frames.append(frame[frame["ScientificName"].str.strip() == species])
+    frame = pd.concat(frames, ignore_index=True)
+
+    observations = dataset.driver_values(frame)
+    observations[dataset.FLUX_COLUMN] = frame[dataset.FLUX_COLUMN]
+    observations["Study_ID"] = frame["Study_ID"]
+
+    # The Data sheet repeats most Crustacea rows; log-domain fitting needs positive fluxes
+    observations = observations.drop_duplicates()
+    return observations[observations[dataset.FLUX_COLUMN] > 0].reset_index(drop=True)
+
+
+def fill_values(species, observations=None):
+    """Value that fills each missing driver of ``species``: the median of its
+    observations, or the middle of its Table 1 range if it was never reported."""
+    observations = load_observations(species) if observations is None else observations
+    values = {}
+    for name in model.DRIVERS:
+        median = observations[name].median()
+        values[name] = float(np.mean(model.SPECIES_RANGES[species][name]) if pd.isna(median) else median)
+    return values
+
+
+def design_matrix(drivers):
+    """Columns of d log(flux) / d(log α, β₁ … β₆), matching the clipping in methane_emission_model."""
+    return np.column_stack([
+        np.ones(len(drivers["temp"])),
+        drivers["temp"],
+        np.log(np.clip(drivers["TOC"], 5, None)),
+        np.log(np.clip(drivers["salinity"], 1e-10, None)),
+        -drivers["nitrogen"],
+        -drivers["DO"],
+        np.log(np.clip(drivers["pH"], 1e-10, None)),
+    ])
+
+
+def _prior():
+    theta = np.array([model.DEFAULT_PARAMS[name] for name in model.PARAMETERS], dtype=float)
+    theta[0] = np.log(theta[0])
+    return theta
+
+
+def _penalty(X):
+    # Ridge on standardised slopes, none on the intercept; constant columns are pinned to the prior
+    slopes = X[:, 1:]
+    scale = np.where(np.ptp(slopes, axis=0) > 0, slopes.std(axis=0), 1.0)
+    return np.diag(np.r_[0.0, RIDGE * len(X) * scale ** 2])
+
+
+def _solve(X, y, penalty, prior):
+    """Penalised least squares for one problem (2-D ``X``) or a batch of them (3-D ``X``)."""
+    XtX = np.einsum("...ni,...nj->...ij", X, X) + penalty
+    Xty = np.einsum("...ni,...n->...i", X, y) + penalty @ prior
+    return np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+
+def _bootstrap_batch(X, y, penalty, prior, replicates, seed):
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(y), size=(replicates, len(y)))
+    return _solve(X[index], y[index], penalty, prior)
+
+
+def bootstrap(X, y, penalty, prior, replicates=2000, workers=None, batch_size=500, seed=0):
+    """Return ``(replicates, 7)`` parameter draws from a case-resampling bootstrap."""
+    seeds = np.random.SeedSequence(seed).spawn(-(-replicates // batch_size))
+    sizes = [min(batch_size, replicates - i * batch_size) for i in range(len(seeds))]
+    workers = min(workers or os.cpu_count() or 1, len(seeds))
+    if workers == 1:
+        batches = [_bootstrap_batch(X, y, penalty, prior, n, s) for n, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_bootstrap_batch, X, y, penalty, prior, n, s) for n, s in zip(sizes, seeds)]
+            batches = [future.result() for future in futures]
+    return np.concatenate(batches)
+
+
+def _to_params(theta):
+    values = dict(zip(model.PARAMETERS, (float(v) for v in theta)))
+    values["alpha"] = float(np.exp(values["alpha"]))
+    return values
+
+
+def fit_species(species, replicates=2000, workers=None, seed=0):
+    """Fit one species and return its parameters, 95 % bootstrap intervals and fit statistics.
+
+    ``cov`` is the covariance of the bootstrap draws of (log α, β₁ … β₆).
+    A slope whose driver never varies in the data is pinned to its default
+    by the penalty; ``identified`` marks it False and its interval is
+    meaningless (zero width).
+    """
+    observations = load_observations(species)
+    if observations.empty:
+        raise ValueError(f"No positive CH₄ observations for {species}")
+
+    fills = fill_values(species, observations)
+    drivers = {name: observations[name].fillna(fills[name]).to_numpy(dtype=float) for name in model.DRIVERS}
+
+    X = design_matrix(drivers)
+    y = np.log(observations[dataset.FLUX_COLUMN].to_numpy(dtype=float))
+    prior = _prior()
+    penalty = _penalty(X)
+
+    theta = _solve(X, y, penalty, prior)
+    residuals = y - X @ theta
+    draws = bootstrap(X, y, penalty, prior, replicates, workers, seed=seed)
+    low, high = np.percentile(draws, [2.5, 97.5], axis=0)
+
+    return {
+        "params": _to_params(theta),
+        "ci": {name: [lo, hi] for name, lo, hi in zip(model.PARAMETERS, _to_params(low).values(), _to_params(high).values())},
+        "cov": np.cov(draws, rowvar=False).tolist(),
+        "identified": dict(zip(model.PARAMETERS, [True] + (np.ptp(X[:, 1:], axis=0) > 0).tolist())),
+        "n_obs": int(len(y)),
+        "observed": {name: int(observations[name].notna().sum()) for name in model.DRIVERS},
+        "rmse_log": float(np.sqrt(np.mean(residuals ** 2))),
+    }
+
+
+def _cache_path(version, replicates, seed):
+    return CACHE_DIR / f"v{FIT_VERSION}-{version[:16]}-b{replicates}-s{seed}.json"
+
+
+def calibrate(replicates=2000, workers=None, seed=0, refit=False):
+    """Fitted parameters for every species, loaded from the cache when the data, method and settings are unchanged."""
+    version = dataset.version()
+    path = _cache_path(version, replicates, seed)
+    if not refit and path.exists():
+        with open(path) as handle:
+            return json.load(handle)
+
+    result = {
+        "fit_version": FIT_VERSION,
+        "data_sha256": version,
+        "bootstrap_replicates": replicates,
+        "seed": seed,
+        "species": {species: fit_species(species, replicates, workers, seed) for species in model.SPECIES},
+    }
+    dataset.atomic_write(path, lambda tmp: Path(tmp).write_text(json.dumps(result, indent=2)))
+    return result
+
+
+def fitted_params(species):
+    """Model parameters fitted for ``species``, in the form methane_emission_model expects."""
+    return calibrate()["species"][species]["params"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bootstrap", type=int, default=2000, help="bootstrap replicates (default: 2000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--refit", action="store_true", help="ignore any cached fit")
+    args = parser.parse_args(argv)
+
+    result = calibrate(args.bootstrap, args.workers, args.seed, refit=args.refit)
+    for species, fit in result["species"].items():
+        print(f"{species}  (n={fit['n_obs']}, RMSE log-flux={fit['rmse_log']:.3f})")
+        for name in model.PARAMETERS:
+            lo, hi = fit["ci"][name]
+            interval = f"[{lo:.5g}, {hi:.5g}]" if fit["identified"][name] else "not identified (kept at default)"
+            print(f"  {name:<7} {fit['params'][name]:>12.5g}   {interval}")
+
+
+if __name__ == "__main__":
+    main()
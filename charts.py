@@ -0,0 +1,111 @@
+"""Plotly figures shared by the app and the benchmarks."""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Points per axis sent to the browser for contour lines and for the heatmap's hover readout
+BROWSER_POINTS = 250
+
+
+def surface_figure(plot_type, x_axis_param, x_values, y_axis_param, y_values, methane_flux_grid):
+    """Heatmap or contour of a ``(len(y_values), len(x_values))`` flux grid."""
+    fig = go.Figure()
+    # Contour lines and hover readouts gain nothing from a finer grid than the browser can show, so stride it
+    step = max(1, len(x_values) // BROWSER_POINTS)
+    hovertemplate = f"{x_axis_param}: " + "%{x:.2f}<br>" + f"{y_axis_param}: " + "%{y:.2f}<br>CH₄ Flux: %{z:.2f} mg CH₄/m²/day<extra></extra>"
+    if plot_type == "Heatmap":
+        # Ship the grid as a colour-mapped PNG instead of a JSON matrix so 10^6 cells stay responsive
+        flux_min, flux_max = float(methane_flux_grid.min()), float(methane_flux_grid.max())
+        palette = np.round(np.array(px.colors.sample_colorscale("Viridis", 256, colortype="tuple")) * 255).astype(np.uint8)
+        levels = np.round((methane_flux_grid - flux_min) / ((flux_max - flux_min) or 1.0) * 255).astype(np.uint8)
+        fig = px.imshow(palette[levels], x=x_values, y=y_values, origin="lower", aspect="auto", binary_string=True)
+        # The image only knows pixel colours; a transparent heatmap on the strided grid reads out the flux
+        fig.update_traces(hoverinfo="skip", hovertemplate=None)
+        fig.add_trace(go.Heatmap(
+            x=x_values[::step], y=y_values[::step], z=methane_flux_grid[::step, ::step],
+            opacity=0, showscale=False, hovertemplate=hovertemplate,
+        ))
+        # Invisible trace that only carries the colour bar
+        fig.add_trace(go.Scatter(
+            x=[None], y=[None], mode="markers", showlegend=False,
+            marker=dict(colorscale="Viridis", cmin=flux_min, cmax=flux_max, color=[flux_min],
+                        colorbar=dict(title="CH₄ Flux"))
+        ))
+    else:
+        fig.add_trace(go.Contour(
+            x=x_values[::step],
+            y=y_values[::step],
+            z=methane_flux_grid[::step, ::step],
+            colorscale="Viridis",
+            colorbar=dict(title="CH₄ Flux"),
+            hovertemplate=hovertemplate,
+        ))
+
+    fig.update_layout(
+        title=f"Effect of {x_axis_param} and {y_axis_param} on Methane Flux",
+        xaxis_title=x_axis_param,
+        yaxis_title=y_axis_param,
+    )
+    return fig
+
+
+def _country_map(frame, color, colorbar_title):
+    fig_country = px.choropleth(
+        frame,
+        locations="Country",
+        locationmode="country names",
+        color=color,
+        hover_name="Country",
+        color_continuous_scale="Viridis",
+    )
+    fig_country.update_geos(showcoastlines=True, coastlinecolor="Black", showland=True, landcolor="lightgrey")
+    fig_country.update_layout(coloraxis_colorbar=dict(title=colorbar_title))
+    return fig_country
+
+
+def studies_by_country(country_counts):
+    """World map with a heatmap indicating the number of studies per country."""
+    return _country_map(country_counts, "Count", "Number of Studies")
+
+
+def emissions_by_country(country_totals):
+    """World map of national emissions (``Country``, ``emission_t`` columns) in t CH₄/year."""
+    return _country_map(country_totals, "emission_t", "t CH₄/year")
+
+
+def emissions_by_scenario(national_totals):
+    """Grouped bars of each country's emission under every scenario."""
+    frame = national_totals.reset_index().melt(id_vars="Country", var_name="Scenario", value_name="emission_t")
+    return px.bar(
+        frame,
+        x="Country",
+        y="emission_t",
+        color="Scenario",
+        barmode="group",
+        labels={"emission_t": "Emission (t CH₄/year)"},
+    )
+
+
+def studies_by_year(year_counts):
+    """Bar plot for the number of studies by year."""
+    return px.bar(
+        year_counts,
+        x='Year',
+        y='Count',
+        labels={'Count': 'Number of Studies', 'Year': 'Year'}
+    )
+
+
+def flux_scatter(points, driver, driver_label):
+    """Observed CH₄ flux against one driver, on a log flux axis."""
+    fig = px.scatter(
+        points,
+        x=driver,
+        y="CH4",
+        log_y=True,
+        render_mode="webgl",
+        labels={driver: driver_label, "CH4": "Observed CH₄ Flux (mg CH₄/m²/day)"},
+    )
+    fig.update_layout(title=f"Observed Methane Flux vs {driver_label}")
+    return fig
@@ -0,0 +1,131 @@
+"""Cumulative methane emissions over a production cycle for many ponds.
+
+Drivers are ``(ponds, steps)`` arrays (one row per pond, one column per time
+step of ``dt_days``), usually ``.npy`` files opened as memory maps so fleets
+larger than RAM can be simulated. Ponds are processed in blocks: each block is
+scored for all time steps at once and its running total is written straight
+into the output trajectory. Each step contributes flux × dt, i.e. drivers are
+treated as averages over their step.
+
+Example:
+    python cycle_sim.py runs/fleet --ponds 10000 --species "Penaeus monodon"
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+import model
+
+# Largest number of pond-steps evaluated at once
+CHUNK_CELLS = 1 << 21
+
+
+def open_array(path, shape=None, mode="r"):
+    """Memory-map a ``.npy`` file, creating a float64 array of ``shape`` when ``mode`` is ``"w+"``."""
+    if mode == "w+":
+        return np.lib.format.open_memmap(path, mode=mode, dtype=np.float64, shape=shape)
+    return np.load(path, mmap_mode=mode)
+
+
+def load_drivers(directory):
+    """Memory-map ``<driver>.npy`` for every model driver in ``directory``."""
+    return {name: open_array(Path(directory) / f"{name}.npy") for name in model.DRIVERS}
+
+
+def scenario_drivers(base, ponds, days, dt_days=1.0, temp_amplitude=3.0, variability=0.1, seed=0, directory=None):
+    """Synthetic driver series around the ``base`` values.
+
+    Temperature follows a seasonal sine of ``temp_amplitude`` °C with a random
+    phase per pond; every driver gets a per-pond offset and step-to-step noise
+    of relative size ``variability``. With ``directory`` the series are written
+    to memory-mapped ``.npy`` files instead of being held in memory.
+    """
+    rng = np.random.default_rng(seed)
+    steps = int(round(days / dt_days))
+    t = np.arange(steps) * dt_days
+    drivers = {}
+    for name in model.DRIVERS:
+        out = open_array(Path(directory) / f"{name}.npy", (ponds, steps), "w+") if directory else np.empty((ponds, steps))
+        rows = max(1, CHUNK_CELLS // max(steps, 1))
+        for start in range(0, ponds, rows):
+            n = min(rows, ponds - start)
+            level = base[name] * (1 + variability * rng.standard_normal((n, 1)))
+            series = level * (1 + 0.5 * variability * rng.standard_normal((n, steps)))
+            if name == "temp":
+                phase = rng.uniform(0, 2 * np.pi, (n, 1))
+                series += temp_amplitude * np.sin(2 * np.pi * t / 365 + phase)
+            out[start:start + n] = np.clip(series, 0, None)
+        drivers[name] = out
+    return drivers
+
+
+def simulate(drivers, dt_days=1.0, params=None, trajectory=None):
+    """Integrate flux over time for every pond.
+
+    ``drivers`` maps each model driver to a ``(ponds, steps)`` array (or a
+    scalar). Returns ``(totals, trajectory)`` in mg CH₄/m², where
+    ``trajectory[p, s]`` is the cumulative emission of pond ``p`` at the end of
+    step ``s``. Pass a memory-mapped array as ``trajectory`` to keep the output
+    on disk.
+    """
+    shape = np.broadcast_shapes(*(np.shape(drivers[name]) for name in model.DRIVERS))
+    if len(shape) != 2:
+        raise ValueError(f"Drivers must broadcast to (ponds, steps), got {shape}")
+    ponds, steps = shape
+    if trajectory is None:
+        trajectory = np.empty(shape)
+
+    rows = max(1, CHUNK_CELLS // max(steps, 1))
+    for start in range(0, ponds, rows):
+        block = slice(start, min(start + rows, ponds))
+        values = {
+            name: drivers[name][block] if np.ndim(drivers[name]) and np.shape(drivers[name])[0] == ponds else drivers[name]
+            for name in model.DRIVERS
+        }
+        flux = np.broadcast_to(model.predict(values, params), (block.stop - block.start, steps))
+        np.cumsum(flux * dt_days, axis=1, out=trajectory[block])
+    return np.array(trajectory[:, -1]), trajectory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workdir", help="directory with <driver>.npy inputs; trajectory.npy and totals.npy are written here")
+    parser.add_argument("--species", choices=model.SPECIES, default=model.SPECIES[0])
+    parser.add_argument("--dt", type=float, default=1.0, help="time step in days (default: 1; 1/24 for hourly data)")
+    parser.add_argument("--ponds", type=int, default=None, help="generate a synthetic fleet of this size first")
+    parser.add_argument("--days", type=float, default=None, help="cycle length for a synthetic fleet (default: species maximum)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--default-params", action="store_true", help="use the default instead of the calibrated parameters")
+    args = parser.parse_args(argv)
+
+    workdir = Path(args.workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    if args.ponds:
+        base = {name: float(np.mean(model.SPECIES_RANGES[args.species][name])) for name in model.DRIVERS}
+        days = args.days or model.SPECIES_CYCLE_DAYS[args.species][1]
+        scenario_drivers(base, args.ponds, days, args.dt, seed=args.seed, directory=workdir)
+
+    if args.default_params:
+        params = model.DEFAULT_PARAMS
+    else:
+        import calibration
+
+        params = calibration.fitted_params(args.species)
+
+    drivers = load_drivers(workdir)
+    start = time.perf_counter()
+    shape = np.broadcast_shapes(*(d.shape for d in drivers.values()))
+    totals, _ = simulate(drivers, args.dt, params, open_array(workdir / "trajectory.npy", shape, "w+"))
+    np.save(workdir / "totals.npy", totals)
+    elapsed = time.perf_counter() - start
+
+    kg_ha = totals * model.MG_M2_TO_KG_HA
+    print(f"{shape[0]:,} ponds x {shape[1]:,} steps in {elapsed:.2f} s")
+    print(f"Cycle total (kg CH4/ha): median {np.median(kg_ha):.3g}, 5-95% {np.percentile(kg_ha, 5):.3g}-{np.percentile(kg_ha, 95):.3g}")
+
+
+if __name__ == "__main__":
+    main()
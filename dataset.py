@@ -0,0 +1,162 @@
+"""Columnar cache for the sheets of DataModels.xlsx.
+
+The workbook is parsed with openpyxl once; every sheet is then stored as a
+Parquet file under ``.cache/dataset/<sha256>/``. A small manifest records the
+source file's mtime and size so later loads (from any session or process) can
+skip hashing and go straight to the Parquet files.
+
+The workbook's column conventions (observed flux, driver columns and their
+plausible ranges) live here too, with driver_values() applying them, so every
+reader of the sheets extracts the drivers the same way.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+DATA_FILE = Path(__file__).with_name("DataModels.xlsx")
+CACHE_DIR = Path(os.environ.get("MODELAPP_CACHE_DIR", Path(__file__).with_name(".cache"))) / "dataset"
+
+# Observed CH₄ flux column of the study sheets (mg CH₄/m²/day)
+FLUX_COLUMN = "CH4"
+
+# Workbook column(s) for each model driver; nitrogen is the sum of the reported N species
+DRIVER_COLUMNS = {
+    "temp": ["Temperature"],
+    "TOC": ["TOC"],
+    "salinity": ["Salinity%"],
+    "nitrogen": ["Ammonia", "Nitrite", "Nitrate"],
+    "DO": ["DO"],
+    "pH": ["pH"],
+}
+
+# Studies report some drivers in other units or media (e.g. sediment TOC in mg/kg,
+# nitrogen in mg/L); values outside these windows are treated as not reported
+PLAUSIBLE_RANGES = {
+    "temp": (0, 45),
+    "TOC": (0, 200),
+    "salinity": (0, 80),
+    "nitrogen": (10, 10_000),
+    "DO": (0, 20),
+    "pH": (4, 11),
+}
+
+
+def driver_values(frame):
+    """Model drivers of each row of a study sheet, NaN where not reported.
+
+    Text is parsed as numbers, drivers spread over several columns are summed,
+    and values outside PLAUSIBLE_RANGES count as not reported.
+    """
+    drivers = pd.DataFrame(
+        {name: frame[columns].apply(pd.to_numeric, errors="coerce").sum(axis=1, min_count=1) for name, columns in DRIVER_COLUMNS.items()},
+        index=frame.index,
+    )
+    for name, (low, high) in PLAUSIBLE_RANGES.items():
+        drivers[name] = drivers[name].where(drivers[name].between(low, high))
+    return drivers
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atomic_write(path, write):
+    """Call ``write(tmp_path)`` and rename the result to ``path``, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _typed(frame):
+    # Excel columns such as StockingDensity mix numbers and text; Parquet needs one type per column
+    frame = frame.copy()
+    for column in frame.columns[frame.dtypes == object]:
+        values = frame[column]
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().sum() == values.notna().sum():
+            frame[column] = numeric
+        else:
+            frame[column] = values.where(values.isna(), values.astype(str))
+    return frame
+
+
+def _manifest_path(path):
+    return CACHE_DIR / f"{Path(path).stem}.json"
+
+
+def _read_manifest(path):
+    try:
+        with open(_manifest_path(path)) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _sheet_file(sha256, index):
+    return CACHE_DIR / sha256 / f"sheet{index:02d}.parquet"
+
+
+def _build(path, sha256):
+    sheets = pd.read_excel(path, sheet_name=None)
+    for index, frame in enumerate(sheets.values()):
+        atomic_write(_sheet_file(sha256, index), lambda tmp, frame=frame: _typed(frame).to_parquet(tmp, index=False))
+    return list(sheets)
+
+
+def _manifest(path=DATA_FILE):
+    """Return the manifest for ``path``, (re)building the columnar cache if the workbook changed."""
+    path = Path(path)
+    stat = path.stat()
+    manifest = _read_manifest(path)
+    if manifest and manifest["mtime_ns"] == stat.st_mtime_ns and manifest["size"] == stat.st_size:
+        return manifest
+
+    # mtime changed: only re-parse if the content did too
+    sha256 = _file_digest(path)
+    if manifest and manifest["sha256"] == sha256 and all(
+        _sheet_file(sha256, i).exists() for i in range(len(manifest["sheets"]))
+    ):
+        sheets = manifest["sheets"]
+    else:
+        sheets = _build(path, sha256)
+
+    manifest = {"sha256": sha256, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sheets": sheets}
+    atomic_write(_manifest_path(path), lambda tmp: Path(tmp).write_text(json.dumps(manifest, indent=2)))
+    return manifest
+
+
+def version(path=DATA_FILE):
+    """Content hash of the workbook; use it as a cache key for anything derived from the data."""
+    return _manifest(path)["sha256"]
+
+
+def sheet_names(path=DATA_FILE):
+    return list(_manifest(path)["sheets"])
+
+
+def load_sheet(sheet_name, path=DATA_FILE, columns=None):
+    """Load one sheet from the columnar cache, optionally only the given ``columns``."""
+    manifest = _manifest(path)
+    if sheet_name not in manifest["sheets"]:
+        raise KeyError(f"Sheet '{sheet_name}' not found in {Path(path).name}")
+    return pd.read_parquet(_sheet_file(manifest["sha256"], manifest["sheets"].index(sheet_name)), columns=columns)
+
+
+def load_workbook(path=DATA_FILE):
+    """Load every sheet as a ``{sheet_name: DataFrame}`` dict, like ``pd.read_excel(sheet_name=None)``."""
+    return {name: load_sheet(name, path) for name in sheet_names(path)}
@@ -0,0 +1,134 @@
+"""Indexed filtering and aggregation over the study sheets of DataModels.xlsx.
+
+An Explorer is built once per sheet. Each filter dimension (species,
+country, year, system type) is factorized into integer codes, so a query is
+one table lookup per active dimension (``allowed[codes]``) instead of string
+comparisons over the sheet. Group-by aggregates (studies, measurements and
+mean CH₄ per group) are bincounts over those codes and are cached per filter
+combination.
+
+Scatter plots of observed CH₄ against a driver are thinned by keeping one point
+per cell of a grid over (driver, log CH₄), which preserves the shape and the
+outliers of the cloud while bounding what is sent to the browser.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+import dataset
+
+# Filter dimension -> workbook column
+DIMENSIONS = {
+    "species": "ScientificName",
+    "country": "Country",
+    "year": "Year",
+    "system": "System",
+}
+
+# Most points returned by Explorer.scatter
+SCATTER_POINTS = 2_000
+
+
+def _freeze(filters):
+    """Hashable form of ``{dimension: values}``; empty selections mean no filter."""
+    return tuple(sorted((name, tuple(sorted(values))) for name, values in (filters or {}).items() if values))
+
+
+class Explorer:
+    def __init__(self, frame):
+        self.rows = len(frame)
+        self.codes = {}
+        self.categories = {}
+        for name, column in DIMENSIONS.items():
+            values = frame[column]
+            if values.dtype == object or pd.api.types.is_string_dtype(values):
+                values = values.str.strip()
+            elif name == "year":
+                values = values.astype("Int64")
+            # Missing values get code -1, which indexes the always-False last slot of a lookup table
+            codes, categories = pd.factorize(values, sort=True)
+            self.codes[name] = codes.astype(np.int32)
+            self.categories[name] = categories
+
+        self.studies, study_ids = pd.factorize(frame["Study_ID"])
+        self.study_count = len(study_ids)
+        self.dois = frame["DOI"].to_numpy()
+        self.flux = pd.to_numeric(frame[dataset.FLUX_COLUMN], errors="coerce").to_numpy(dtype=float)
+        # Out-of-range values (other units or media) are dropped, so the scatter axes hold one unit each
+        self.drivers = {name: values.to_numpy(dtype=float) for name, values in dataset.driver_values(frame).items()}
+        self._aggregate = functools.lru_cache(maxsize=256)(self._aggregate)
+        self._mask = functools.lru_cache(maxsize=64)(self._mask)
+
+    def options(self, dimension):
+        """Values a ``dimension`` can be filtered on, sorted."""
+        return self.categories[dimension].tolist()
+
+    def _mask(self, key):
+        mask = np.ones(self.rows, dtype=bool)
+        for name, values in key:
+            categories = self.categories[name]
+            allowed = np.zeros(len(categories) + 1, dtype=bool)
+            allowed[categories.get_indexer(list(values))] = True
+            allowed[-1] = False
+            mask &= allowed[self.codes[name]]
+        mask.flags.writeable = False
+        return mask
+
+    def mask(self, filters=None):
+        """Boolean row mask for ``{dimension: values}``: rows matching any value in every dimension."""
+        return self._mask(_freeze(filters))
+
+    def _aggregate(self, by, key):
+        mask = self._mask(key)
+        categories = self.categories[by]
+        codes = self.codes[by][mask]
+        studies = self.studies[mask]
+        valid = codes >= 0
+        codes, studies, flux = codes[valid], studies[valid], self.flux[mask][valid]
+
+        size = len(categories)
+        # A group's study count is the number of distinct studies among its rows
+        pairs = codes[studies >= 0].astype(np.int64) * self.study_count + studies[studies >= 0]
+        present = np.bincount(pairs, minlength=size * self.study_count).reshape(size, self.study_count) > 0
+        measured = ~np.isnan(flux)
+        flux_sum = np.bincount(codes[measured], weights=flux[measured], minlength=size)
+        flux_count = np.bincount(codes[measured], minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_flux = flux_sum / flux_count
+        result = pd.DataFrame(
+            {
+                "studies": present.sum(axis=1),
+                "measurements": np.bincount(codes, minlength=size),
+                "mean_flux": mean_flux,
+            },
+            index=pd.Index(categories, name=DIMENSIONS[by]),
+        )
+        return result[result["measurements"] > 0]
+
+    def aggregate(self, by, filters=None):
+        """Studies, measurements and mean CH₄ per value of dimension ``by`` among the filtered rows.
+
+        The returned frame is shared between calls with the same arguments; copy it before changing it.
+        """
+        return self._aggregate(by, _freeze(filters))
+
+    def references(self, filters=None):
+        """Distinct DOIs of the filtered rows, in sheet order."""
+        return [doi for doi in pd.unique(self.dois[self.mask(filters)]) if isinstance(doi, str)]
+
+    def scatter(self, driver, filters=None, max_points=SCATTER_POINTS):
+        """Observed ``(driver, CH₄)`` pairs of the filtered rows, thinned to at most ``max_points``."""
+        mask = self.mask(filters)
+        x, y = self.drivers[driver][mask], self.flux[mask]
+        keep = np.isfinite(x) & (y > 0)
+        x, y = x[keep], y[keep]
+        if len(x) > max_points:
+            cells = int(np.sqrt(max_points))
+            log_y = np.log10(y)
+            column = np.minimum(((x - x.min()) / (np.ptp(x) or 1) * cells).astype(np.int64), cells - 1)
+            row = np.minimum(((log_y - log_y.min()) / (np.ptp(log_y) or 1) * cells).astype(np.int64), cells - 1)
+            _, first = np.unique(row * cells + column, return_index=True)
+            x, y = x[first], y[first]
+        return pd.DataFrame({driver: x, dataset.FLUX_COLUMN: y})
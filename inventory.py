@@ -0,0 +1,162 @@
+"""National methane inventory of crustacean pond farming under management scenarios.
+
+Production (tonnes per year) is turned into pond area with per-species
+stocking assumptions, and area into emissions with the per-area flux of the
+model:
+
+    yield (t/ha/cycle) = stocking density × survival × harvest weight
+    area (ha)          = production / (yield × cycles per year)
+    emission (t CH₄/y) = flux × area × cycles per year × cycle length
+
+Pond conditions for each country and species are the medians reported in the
+ProdCrust sheet. Drivers a country has no data for are filled as in the
+calibration (calibration.fill_values): with the species median of the
+observations the parameters were fitted on, or the middle of the species'
+ideal range if none were reported. The ``imputed`` column lists the filled
+drivers of each row. A scenario adjusts those conditions (e.g. aeration raises
+DO). Every country × species × scenario row is evaluated in one vectorized
+model call, with parameters broadcast per row.
+
+The workbook has no national production statistics, so PRODUCTION defaults to
+the 2023 species totals quoted in the app, split equally among each species'
+top three producers; pass a table of national figures to replace it.
+
+Example:
+    python inventory.py --scenario "Aeration (+2 mg/L DO)"
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import calibration
+import dataset
+import model
+
+SHEET = "ProdCrust"
+
+# 2023 production (tonnes) and top three producers of each species
+SPECIES_PRODUCTION = {
+    "Litopenaeus vannamei": (5_500_000, ("China", "India", "Ecuador")),
+    "Penaeus monodon": (900_000, ("Vietnam", "Thailand", "Indonesia")),
+    "Eriocheir sinensis": (500_000, ("China", "South Korea", "Japan")),
+}
+
+PRODUCTION = pd.DataFrame(
+    [
+        (country, species, total / len(countries))
+        for species, (total, countries) in SPECIES_PRODUCTION.items()
+        for country in countries
+    ],
+    columns=["Country", "Species", "tonnes"],
+)
+
+# Semi-intensive pond farming: stocking density (animals/m²), survival to harvest, harvest weight (g), cycles per year
+ASSUMPTIONS = pd.DataFrame(
+    {
+        "stocking_density": [60.0, 20.0, 1.0],
+        "survival": [0.7, 0.6, 0.5],
+        "harvest_weight_g": [20.0, 30.0, 150.0],
+        "cycles_per_year": [2.5, 2.0, 1.0],
+    },
+    index=pd.Index(model.SPECIES, name="Species"),
+)
+
+# Scenario -> {driver: (scale, offset)}; the adjusted driver is value × scale + offset
+SCENARIOS = {
+    "Current practice": {},
+    "Aeration (+2 mg/L DO)": {"DO": (1.0, 2.0)},
+    "Sediment removal (-30% TOC)": {"TOC": (0.7, 0.0)},
+    "Aeration + sediment removal": {"DO": (1.0, 2.0), "TOC": (0.7, 0.0)},
+}
+
+
+def pond_conditions(species=model.SPECIES):
+    """Median drivers per (Country, Species) in the ProdCrust sheet, NaN where not reported."""
+    frame = dataset.load_sheet(SHEET)
+    frame = frame.assign(Country=frame["Country"].str.strip(), Species=frame["ScientificName"].str.strip())
+    frame = frame[frame["Species"].isin(species)]
+
+    return dataset.driver_values(frame).groupby([frame["Country"], frame["Species"]]).median()
+
+
+def inventory(production=None, assumptions=None, scenarios=None, params=None, conditions=None, fills=None):
+    """Emissions for every country × species × scenario, one row each.
+
+    ``params`` maps species to model parameters (default: the calibrated
+    fits) and ``fills`` maps species to the values of missing drivers
+    (default: calibration.fill_values). Returns the inputs of each row with
+    ``imputed`` (the drivers filled in, comma-separated), ``area_ha``,
+    ``flux`` (mg CH₄/m²/day), ``emission_t`` (t CH₄/year) and
+    ``intensity`` (kg CH₄ per tonne produced).
+    """
+    production = PRODUCTION if production is None else production
+    assumptions = ASSUMPTIONS if assumptions is None else assumptions
+    scenarios = SCENARIOS if scenarios is None else scenarios
+    conditions = pond_conditions() if conditions is None else conditions
+    if params is None:
+        params = {species: calibration.fitted_params(species) for species in model.SPECIES}
+
+    # An empty merge keeps the assumptions' "Species" index name, which clashes with the column below
+    table = production.merge(assumptions, left_on="Species", right_index=True).reset_index(drop=True)
+    cycle_days = {species: float(np.mean(days)) for species, days in model.SPECIES_CYCLE_DAYS.items()}
+    table["cycle_days"] = table["Species"].map(cycle_days)
+    yield_t_ha = table["stocking_density"] * 1e4 * table["survival"] * table["harvest_weight_g"] / 1e6
+    table["area_ha"] = table["tonnes"] / (yield_t_ha * table["cycles_per_year"])
+
+    # Reported pond conditions; gaps get the same values as in the calibration
+    table = table.merge(conditions.reindex(columns=model.DRIVERS), left_on=["Country", "Species"], right_index=True, how="left")
+    if fills is None:
+        fills = {species: calibration.fill_values(species) for species in table["Species"].unique()}
+    missing = table[list(model.DRIVERS)].isna().to_numpy()
+    table["imputed"] = [", ".join(name for name, gap in zip(model.DRIVERS, row) if gap) for row in missing]
+    for name in model.DRIVERS:
+        table[name] = table[name].fillna(table["Species"].map({species: values[name] for species, values in fills.items()}))
+
+    # One row per scenario, with a scale and offset column per driver
+    rows = []
+    for name, changes in scenarios.items():
+        row = {"Scenario": name}
+        for driver in model.DRIVERS:
+            row[f"{driver}_scale"], row[f"{driver}_offset"] = changes.get(driver, (1.0, 0.0))
+        rows.append(row)
+    adjustments = pd.DataFrame(rows)
+    table = table.merge(adjustments, how="cross")
+    for name in model.DRIVERS:
+        table[name] = table[name] * table.pop(f"{name}_scale") + table.pop(f"{name}_offset")
+
+    species_params = {
+        name: table["Species"].map({species: values[name] for species, values in params.items()}).to_numpy()
+        for name in model.PARAMETERS
+    }
+    table["flux"] = model.predict({name: table[name].to_numpy() for name in model.DRIVERS}, species_params)
+    kg_per_ha_year = table["flux"] * model.MG_M2_TO_KG_HA * table["cycle_days"] * table["cycles_per_year"]
+    table["emission_t"] = kg_per_ha_year * table["area_ha"] / 1000
+    table["intensity"] = table["emission_t"] * 1000 / table["tonnes"]
+    return table
+
+
+def national_totals(table):
+    """Total emission (t CH₄/year) per country, one column per scenario."""
+    return table.pivot_table(index="Country", columns="Scenario", values="emission_t", aggfunc="sum", sort=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=list(SCENARIOS), default=None, help="show one scenario per species (default: national totals for all)")
+    parser.add_argument("--default-params", action="store_true", help="use the default instead of the calibrated parameters")
+    args = parser.parse_args(argv)
+
+    params = {species: model.DEFAULT_PARAMS for species in model.SPECIES} if args.default_params else None
+    table = inventory(params=params)
+    with pd.option_context("display.width", 160, "display.float_format", "{:,.1f}".format):
+        if args.scenario:
+            rows = table[table["Scenario"] == args.scenario]
+            print(rows[["Country", "Species", "tonnes", "area_ha", "flux", "emission_t", "intensity", "imputed"]].to_string(index=False))
+        else:
+            print(national_totals(table).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Load test for service.py against a local instance.
+
+Opens ``--concurrency`` keep-alive connections and sends scoring requests as
+fast as each connection allows for ``--duration`` seconds, then reports the
+client-side throughput and latency percentiles next to the server's own
+/metrics.
+
+Example:
+    python service.py --port 8600 &
+    python loadtest.py --port 8600 --concurrency 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+import model
+
+
+async def _request(reader, writer, method, path, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+def _payloads(batch_size, count, seed):
+    """Pre-encoded request bodies with drivers drawn from the app's slider ranges."""
+    rng = np.random.default_rng(seed)
+    ranges = {"temp": (1, 40), "TOC": (5, 30), "salinity": (1, 40), "nitrogen": (50, 2000), "DO": (2, 15), "pH": (6, 9)}
+    bodies = []
+    for _ in range(count):
+        values = {name: rng.uniform(*ranges[name], batch_size).round(2).tolist() for name in model.DRIVERS}
+        if batch_size == 1:
+            values = {name: column[0] for name, column in values.items()}
+        bodies.append(json.dumps(values).encode())
+    return bodies
+
+
+async def _client(host, port, path, bodies, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", path, bodies[i % len(bodies)])
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, duration, batch_size=1, seed=0):
+    """Run the load test and return a summary dict."""
+    path = "/predict" if batch_size == 1 else "/predict/batch"
+    bodies = _payloads(batch_size, 256, seed)
+    latencies, errors = [], []
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, path, bodies, deadline, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await _request(reader, writer, "GET", "/metrics")
+    writer.close()
+
+    latency_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_s": len(latencies) / elapsed,
+        "rows_per_s": len(latencies) * batch_size / elapsed,
+        "latency_ms": dict(zip(("p50", "p90", "p99"), np.percentile(latency_ms, [50, 90, 99]).tolist())) if len(latency_ms) else {},
+        "server": json.loads(body),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--concurrency", type=int, default=64, help="parallel keep-alive connections (default: 64)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (default: 10)")
+    parser.add_argument("--batch-size", type=int, default=1, help="rows per request; >1 uses /predict/batch (default: 1)")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run(args.host, args.port, args.concurrency, args.duration, args.batch_size))
+    latency = summary["latency_ms"]
+    print(f"{summary['requests']:,} requests ({summary['errors']} errors) in {args.duration:g} s")
+    print(f"Throughput: {summary['requests_per_s']:,.0f} requests/s, {summary['rows_per_s']:,.0f} rows/s")
+    if latency:
+        print(f"Client latency: p50 {latency['p50']:.2f} ms, p90 {latency['p90']:.2f} ms, p99 {latency['p99']:.2f} ms")
+    server = summary["server"]
+    print(f"Server: p50 {server['latency_ms']['p50']:.2f} ms, p99 {server['latency_ms']['p99']:.2f} ms, "
+          f"mean batch {server['batch_rows']['mean']:.1f} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Methane emission model shared by the Streamlit app and the headless tools."""
+
+import numpy as np
+
+# Environmental drivers, in the order methane_emission_model expects them
+DRIVERS = ("temp", "TOC", "salinity", "nitrogen", "DO", "pH")
+PARAMETERS = ("alpha", "beta_1", "beta_2", "beta_3", "beta_4", "beta_5", "beta_6")
+
+# Default model parameters
+DEFAULT_PARAMS = {
+    "alpha": 1.0,
+    "beta_1": 0.1,
+    "beta_2": 1.0,
+    "beta_3": -0.5,
+    "beta_4": 0.01,
+    "beta_5": -0.01,  # Updated to -0.01 as specified
+    "beta_6": 0.05,
+}
+
+# Ideal water parameters from Table 1 of the app as (low, high) per driver.
+# Open-ended entries such as ">5" or "<1,000" are closed with the slider limits.
+SPECIES_RANGES = {
+    "Litopenaeus vannamei": {"temp": (26, 32), "TOC": (5, 20), "salinity": (5, 20), "nitrogen": (50, 1000), "DO": (5, 15), "pH": (7.5, 8.5)},
+    "Penaeus monodon": {"temp": (28, 32), "TOC": (5, 20), "salinity": (10, 25), "nitrogen": (50, 1000), "DO": (4, 15), "pH": (7.5, 8.5)},
+    "Eriocheir sinensis": {"temp": (18, 28), "TOC": (5, 15), "salinity": (1, 15), "nitrogen": (50, 500), "DO": (5, 15), "pH": (7.5, 8.5)},
+}
+SPECIES = tuple(SPECIES_RANGES)
+
+# Production cycle length in days (min, max), from the species descriptions
+SPECIES_CYCLE_DAYS = {
+    "Litopenaeus vannamei": (90, 120),
+    "Penaeus monodon": (120, 150),
+    "Eriocheir sinensis": (180, 240),
+}
+
+# m² per hectare / mg per kg: converts mg CH₄/m² to kg CH₄/ha
+MG_M2_TO_KG_HA = 1e4 / 1e6
+
+# Largest number of grid cells evaluated at once by sweep()
+SWEEP_CHUNK_CELLS = 1 << 20
+
+
+# Define methane emission model function
+def methane_emission_model(alpha, beta_1, beta_2, beta_3, beta_4, beta_5, beta_6, temp, TOC, salinity, nitrogen, DO, pH):
+    methane_flux = (
+        alpha
+        * np.exp(np.clip(beta_1 * temp, -50, 50))          # Temperature effect
+        * (np.clip(TOC, 5, None) ** beta_2)             # TOC effect
+        * (np.clip(salinity, 1e-10, None) ** beta_3)        # Salinity effect
+        * np.exp(np.clip(-beta_4 * nitrogen, -50, 50))      # Nitrogen effect
+        / np.exp(np.clip(beta_5 * DO, -50, 50))             # DO effect (now beta_5 = -0.01)
+        * (np.clip(pH, 1e-10, None) ** beta_6)              # pH effect
+    )
+    return methane_flux
+
+
+def predict(drivers, params=None):
+    """Evaluate the model on a mapping of driver name -> scalar or array (arrays broadcast)."""
+    params = DEFAULT_PARAMS if params is None else params
+    return methane_emission_model(**params, **{name: drivers[name] for name in DRIVERS})
+
+
+def sweep(grids, fixed, params=None, chunk_cells=SWEEP_CHUNK_CELLS):
+    """Evaluate the model over the Cartesian product of ``grids``.
+
+    ``grids`` maps driver names to 1-D arrays; every other driver is taken
+    from ``fixed``. The result has one axis per grid, in the order given.
+    Each grid is reshaped to its own axis so NumPy broadcasts the per-driver
+    terms, and the first axis is processed in slices of at most
+    ``chunk_cells`` cells to keep temporaries bounded.
+    """
+    names = list(grids)
+    unknown = set(names) - set(DRIVERS)
+    if unknown:
+        raise ValueError(f"Unknown driver(s): {', '.join(sorted(unknown))}")
+
+    axes = [np.asarray(grids[name], dtype=float) for name in names]
+    shape = tuple(len(axis) for axis in axes)
+    out = np.empty(shape)
+    if out.size == 0:
+        return out
+    if not names:
+        out[...] = predict(fixed, params)
+        return out
+
+    drivers = dict(fixed)
+    for i, (name, axis) in enumerate(zip(names[1:], axes[1:]), start=1):
+        drivers[name] = axis.reshape([-1 if j == i else 1 for j in range(len(shape))])
+
+    rows = max(1, chunk_cells // max(1, out[0].size))
+    for start in range(0, shape[0], rows):
+        stop = min(start + rows, shape[0])
+        drivers[names[0]] = axes[0][start:stop].reshape([-1] + [1] * (len(shape) - 1))
+        out[start:stop] = predict(drivers, params)
+    return out
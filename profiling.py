@@ -0,0 +1,79 @@
+"""Per-section wall time, and optionally memory, for one run of the app or a benchmark.
+
+Usage:
+    profiler = Profiler()
+    with profiler.section("Dataset analytics"):
+        ...
+    profiler.table()
+
+``start(name)``/``stop()`` do the same as ``section`` for top-level script code
+that cannot be indented without changing its multi-line strings.
+
+Memory is measured with tracemalloc, which slows every Python allocation in
+the process and keeps one process-wide peak. It is therefore only meant for
+single-process tools such as benchmark.py: with ``memory=True`` tracing is
+started when the outermost section starts and stopped when it ends (unless
+something else had already started it). The app itself only records wall
+time. Sections may be nested; a parent's peak includes its children's.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class Profiler:
+    def __init__(self, enabled=True, memory=False):
+        self.enabled = enabled
+        self.memory = enabled and memory
+        self.records = {}
+        self._stack = []
+        self._started_tracing = False
+
+    def start(self, name):
+        if not self.enabled:
+            return
+        frame = {"name": name, "peak": 0, "start_memory": 0}
+        if self.memory:
+            if not self._stack and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame.update(peak=current, start_memory=current)
+        frame["start"] = time.perf_counter()
+        self._stack.append(frame)
+
+    def stop(self):
+        if not self.enabled:
+            return
+        frame = self._stack.pop()
+        record = {"wall_ms": (time.perf_counter() - frame["start"]) * 1000}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            frame["peak"] = max(frame["peak"], peak)
+            tracemalloc.reset_peak()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], frame["peak"])
+            elif self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            record["peak_mb"] = (frame["peak"] - frame["start_memory"]) / 2 ** 20
+            record["retained_mb"] = (current - frame["start_memory"]) / 2 ** 20
+        self.records[frame["name"]] = record
+
+    @contextmanager
+    def section(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def table(self):
+        """One row per section, in the order the sections finished."""
+        return pd.DataFrame.from_dict(self.records, orient="index").rename_axis("section")
@@ -0,0 +1,99 @@
+"""Global sensitivity of the predicted flux to the six drivers.
+
+Two methods over the species' ideal ranges (model.SPECIES_RANGES), with the
+drivers sampled uniformly:
+
+- sobol(): first-order and total Sobol indices from Saltelli sampling, using
+  the Saltelli (2010) first-order and Jansen total-effect estimators. Each
+  worker draws its own A/B blocks and returns only running sums, so the sample
+  size is limited by time, not memory.
+- morris(): radial one-at-a-time screening (μ*, σ of the elementary effects),
+  which needs far fewer model runs.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import model
+
+# Base samples per block; each block costs (k + 2) x this many model runs
+BLOCK_SAMPLES = 50_000
+
+
+def _bounds(ranges):
+    low = np.array([ranges[name][0] for name in model.DRIVERS], dtype=float)
+    high = np.array([ranges[name][1] for name in model.DRIVERS], dtype=float)
+    return low, high
+
+
+def _evaluate(points, params):
+    return model.predict(dict(zip(model.DRIVERS, points.T)), params)
+
+
+def _sobol_block(ranges, params, n, seed):
+    rng = np.random.default_rng(seed)
+    low, high = _bounds(ranges)
+    k = len(model.DRIVERS)
+    A = low + (high - low) * rng.random((n, k))
+    B = low + (high - low) * rng.random((n, k))
+    fA, fB = _evaluate(A, params), _evaluate(B, params)
+
+    first = np.empty(k)
+    total = np.empty(k)
+    for i in range(k):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        fAB = _evaluate(AB, params)
+        first[i] = np.sum(fB * (fAB - fA))
+        total[i] = np.sum((fA - fAB) ** 2)
+
+    y = np.concatenate([fA, fB])
+    return n, y.sum(), np.sum(y ** 2), first, total
+
+
+def sobol(ranges, params=None, samples=100_000, seed=0, workers=None):
+    """First-order (``S1``) and total (``ST``) Sobol indices, one row per driver.
+
+    ``samples`` base samples cost ``samples * (k + 2)`` model runs in total.
+    """
+    sizes = [min(BLOCK_SAMPLES, samples - start) for start in range(0, samples, BLOCK_SAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers == 1:
+        blocks = [_sobol_block(ranges, params, n, s) for n, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(_sobol_block, [ranges] * len(sizes), [params] * len(sizes), sizes, seeds))
+
+    n = sum(block[0] for block in blocks)
+    mean = sum(block[1] for block in blocks) / (2 * n)
+    variance = sum(block[2] for block in blocks) / (2 * n) - mean ** 2
+    first = sum(block[3] for block in blocks) / n / variance
+    total = sum(block[4] for block in blocks) / (2 * n) / variance
+    return pd.DataFrame({"S1": first, "ST": total}, index=pd.Index(model.DRIVERS, name="driver"))
+
+
+def morris(ranges, params=None, trajectories=1_000, delta=0.1, seed=0):
+    """Mean absolute (``mu_star``) and standard deviation (``sigma``) of the elementary effects.
+
+    Effects are in flux units per full range of each driver; each driver is
+    stepped by ``delta`` of its range from ``trajectories`` random base points.
+    """
+    rng = np.random.default_rng(seed)
+    low, high = _bounds(ranges)
+    k = len(model.DRIVERS)
+    base = rng.random((trajectories, k)) * (1 - delta)
+
+    # Row 0 is the base point, row i + 1 steps driver i
+    unit = np.repeat(base[None], k + 1, axis=0)
+    unit[np.arange(1, k + 1), :, np.arange(k)] += delta
+    flux = _evaluate((low + (high - low) * unit).reshape(-1, k), params).reshape(k + 1, trajectories)
+
+    effects = (flux[1:] - flux[0]) / delta
+    return pd.DataFrame(
+        {"mu_star": np.abs(effects).mean(axis=1), "sigma": effects.std(axis=1)},
+        index=pd.Index(model.DRIVERS, name="driver"),
+    )
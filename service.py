@@ -0,0 +1,307 @@
+"""Local HTTP/JSON scoring service for the methane emission model.
+
+Endpoints:
+    POST /predict        {"temp": 27, "TOC": 15, "salinity": 10, "nitrogen": 100, "DO": 5, "pH": 7.5}
+                         -> {"methane_flux": 30.19}
+    POST /predict/batch  {"rows": [{...}, ...]} or columns {"temp": [...], ...} (scalars broadcast)
+                         -> {"methane_flux": [...]}
+    GET  /metrics        latency percentiles, throughput and batch sizes
+    GET  /health
+
+Either request body may carry "species" to score with that species'
+calibrated parameters instead of the defaults in model.DEFAULT_PARAMS. The
+calibrated parameters are loaded (or fitted) when the server starts.
+Predictions that are not finite (the model overflowed) are returned as null.
+
+Concurrent requests are queued and coalesced into micro-batches: the batcher
+takes whatever arrived within ``max_wait_ms`` of the first queued request (up
+to ``max_batch`` rows) and scores it with a single vectorized model call. If
+that call fails, the requests of the batch are scored one at a time, so one
+bad request only fails itself.
+
+Example:
+    python service.py --port 8600 --max-wait-ms 2
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+import model
+
+# Latencies kept for the percentile metrics
+METRICS_WINDOW = 10_000
+
+# Throughput is reported over this many most recent seconds
+THROUGHPUT_SECONDS = 10
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+MAX_BODY_BYTES = 64 << 20
+
+
+class RequestError(ValueError):
+    """Invalid request; reported to the client as HTTP 400."""
+
+
+@functools.lru_cache(maxsize=None)
+def _params_for(species):
+    if species is None:
+        return model.DEFAULT_PARAMS
+    if species not in model.SPECIES:
+        raise RequestError(f"Unknown species '{species}'; expected one of: {', '.join(model.SPECIES)}")
+    import calibration
+
+    return calibration.fitted_params(species)
+
+
+def _numbers(value):
+    """A JSON number or flat list of numbers as a 1-D float array; booleans, strings and nested lists are refused."""
+    items = value if isinstance(value, list) else [value]
+    if not all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in items):
+        raise RequestError("Driver values must be numbers or flat lists of numbers")
+    return np.array(items, dtype=float)
+
+
+def _columns(payload):
+    """Driver arrays from a single row, a list of rows or column arrays."""
+    rows = payload.get("rows")
+    try:
+        if rows is not None:
+            return {name: _numbers([row[name] for row in rows]) for name in model.DRIVERS}
+        # Scalars broadcast against the arrays, e.g. {"temp": [20, 25, 30], "TOC": 15, ...}
+        arrays = np.broadcast_arrays(*(_numbers(payload[name]) for name in model.DRIVERS))
+        return dict(zip(model.DRIVERS, arrays))
+    except RequestError:
+        raise
+    except KeyError as exc:
+        raise RequestError(f"Missing driver {exc}; expected: {', '.join(model.DRIVERS)}") from None
+    except (TypeError, ValueError) as exc:
+        raise RequestError(f"Invalid driver values: {exc}") from None
+
+
+class Metrics:
+    def __init__(self):
+        self.latencies = deque(maxlen=METRICS_WINDOW)
+        self.completed = deque()
+        self.batch_sizes = deque(maxlen=METRICS_WINDOW)
+        self.requests = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def record_request(self, latency, rows):
+        now = time.perf_counter()
+        self.latencies.append(latency)
+        self.completed.append((now, rows))
+        while self.completed and self.completed[0][0] < now - THROUGHPUT_SECONDS:
+            self.completed.popleft()
+        self.requests += 1
+        self.rows += rows
+
+    def snapshot(self):
+        now = time.perf_counter()
+        window = min(THROUGHPUT_SECONDS, now - self.started) or 1e-9
+        recent = [entry for entry in self.completed if entry[0] >= now - THROUGHPUT_SECONDS]
+        latencies = np.array(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (None, None)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "latency_ms": {"p50": p50, "p99": p99, "samples": len(latencies)},
+            "throughput": {
+                "requests_per_s": len(recent) / window,
+                "rows_per_s": sum(rows for _, rows in recent) / window,
+                "window_s": window,
+            },
+            "batch_rows": {"mean": float(np.mean(self.batch_sizes)) if self.batch_sizes else None, "max": max(self.batch_sizes, default=None)},
+        }
+
+
+class MicroBatcher:
+    """Coalesce queued scoring requests into vectorized model calls."""
+
+    def __init__(self, max_batch=4096, max_wait_ms=2.0, metrics=None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def predict(self, columns, params):
+        """Queue one request's driver arrays and wait for its predictions."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((columns, params, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        rows = len(batch[0][0]["temp"])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get_nowait() if not self.queue.empty() else await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0]["temp"])
+        return batch, rows
+
+    async def _run(self):
+        while True:
+            batch, rows = await self._collect()
+            if self.metrics:
+                self.metrics.batch_sizes.append(rows)
+
+            # One model call per distinct parameter set in the batch
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[1]), []).append(item)
+            for items in groups.values():
+                try:
+                    drivers = {name: np.concatenate([columns[name] for columns, _, _ in items]) for name in model.DRIVERS}
+                    flux = model.predict(drivers, items[0][1])
+                except Exception:
+                    # Find the request that broke the merged call; the others still get their results
+                    for item in items:
+                        self._score_one(*item)
+                    continue
+                offsets = np.cumsum([len(columns["temp"]) for columns, _, _ in items])[:-1]
+                for (_, _, future), values in zip(items, np.split(flux, offsets)):
+                    if not future.done():
+                        future.set_result(values)
+
+    @staticmethod
+    def _score_one(columns, params, future):
+        try:
+            flux = model.predict(columns, params)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(flux)
+
+
+class ScoringServer:
+    def __init__(self, max_batch=4096, max_wait_ms=2.0):
+        self.metrics = Metrics()
+        self.batcher = MicroBatcher(max_batch, max_wait_ms, self.metrics)
+
+    async def _score(self, payload, batch):
+        start = time.perf_counter()
+        if not isinstance(payload, dict):
+            raise RequestError("Request body must be a JSON object")
+        species = payload.get("species")
+        if species is not None and not isinstance(species, str):
+            raise RequestError("species must be a string")
+        params = _params_for(species)
+        columns = _columns(payload)
+        if not batch and len(columns["temp"]) != 1:
+            raise RequestError("/predict takes one row; use /predict/batch for several")
+
+        flux = await self.batcher.predict(columns, params)
+        self.metrics.record_request(time.perf_counter() - start, len(flux))
+        # JSON has no Infinity or NaN
+        values = [value if np.isfinite(value) else None for value in flux.tolist()]
+        return {"methane_flux": values if batch else values[0]}
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if path in ("/predict", "/predict/batch"):
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            try:
+                return 200, await self._score(json.loads(body or b"null"), path == "/predict/batch")
+            except (RequestError, json.JSONDecodeError) as exc:
+                return 400, {"error": str(exc)}
+            except Exception as exc:
+                traceback.print_exc()
+                return 500, {"error": f"Scoring failed: {exc}"}
+        return 404, {"error": f"No route for {path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, response = 413, {"error": "Request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, response = await self.route(method, path.split("?", 1)[0], body)
+                    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                data = json.dumps(response).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8600):
+        # Load (or fit) every species' parameters before accepting connections, so no request
+        # runs the calibration on the event loop
+        for species in model.SPECIES:
+            _params_for(species)
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving methane model on http://{host}:{port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--max-batch", type=int, default=4096, help="most rows scored in one model call (default: 4096)")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="how long to wait for more requests to join a batch (default: 2)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(ScoringServer(args.max_batch, args.max_wait_ms).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import batch_score
+import model
+
+
+def _sensor_log(rows=10):
+    ranges = model.SPECIES_RANGES[model.SPECIES[0]]
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({name: rng.uniform(*ranges[name], rows) for name in model.DRIVERS})
+
+
+def test_csv_to_parquet_with_dtype_drift(tmp_path):
+    frame = _sensor_log()
+    # Chunks of four rows: the first infers int64, float64 and string, later ones see NaN, whole numbers and numbers
+    frame["count"] = pd.array([1, 2, 3, 4, None, 6, 7, 8, 9, 10], dtype="Int64")
+    frame["depth"] = pd.Series([0.5, 1.5, 2.5, 3.5, 4, 5, 6, 7, 8.5, 9], dtype=object)
+    frame["site"] = ["A1", "A2", "A3", "A4", "5", "6", "7", "8", "9", "10"]
+    source, destination = tmp_path / "sensors.csv", tmp_path / "scored.parquet"
+    frame.to_csv(source, index=False)
+
+    rows = batch_score.score_file(source, destination, params=model.DEFAULT_PARAMS, chunk_size=4, workers=1)
+
+    scored = pq.read_table(destination).to_pandas()
+    assert rows == len(scored) == len(frame)
+    assert scored["count"].isna().tolist() == frame["count"].isna().tolist()
+    assert scored["count"].dropna().tolist() == frame["count"].dropna().tolist()
+    assert scored["depth"].tolist() == frame["depth"].tolist()
+    assert scored["site"].tolist() == frame["site"].tolist()
+    expected = model.predict({name: frame[name].to_numpy() for name in model.DRIVERS}, model.DEFAULT_PARAMS)
+    np.testing.assert_allclose(scored[batch_score.OUTPUT_COLUMN], expected)
+
+
+def test_drift_that_cannot_convert_names_the_column(tmp_path):
+    frame = _sensor_log().assign(site=[1, 2, 3, 4, "A5", "A6", "A7", "A8", "A9", "A10"])
+    source = tmp_path / "sensors.csv"
+    frame.to_csv(source, index=False)
+
+    with pytest.raises(ValueError, match="'site'"):
+        batch_score.score_file(source, tmp_path / "scored.parquet", chunk_size=4, workers=1)
+
+
+def test_missing_driver_column_is_a_usage_error(tmp_path, capsys):
+    source = tmp_path / "sensors.csv"
+    _sensor_log().rename(columns={"temp": "Temperature"}).to_csv(source, index=False)
+
+    with pytest.raises(SystemExit):
+        batch_score.main([str(source), str(tmp_path / "scored.csv"), "--default-params", "--column", "DO=Oxygen"])
+    assert "temp, Oxygen (DO)" in capsys.readouterr().err
+    assert not (tmp_path / "scored.csv").exists()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+import calibration
+import model
+
+
+def _problem(rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    ranges = model.SPECIES_RANGES[model.SPECIES[0]]
+    drivers = {name: rng.uniform(*ranges[name], rows) for name in model.DRIVERS}
+    X = calibration.design_matrix(drivers)
+    theta = np.array([0.5, 0.08, 0.9, -0.4, 0.002, -0.05, 0.3])
+    return X, X @ theta + 0.1 * rng.standard_normal(rows), theta
+
+
+def test_design_matrix_reproduces_the_model():
+    X, _, theta = _problem()
+    rng = np.random.default_rng(1)
+    ranges = model.SPECIES_RANGES[model.SPECIES[0]]
+    drivers = {name: rng.uniform(*ranges[name], 50) for name in model.DRIVERS}
+    params = dict(zip(model.PARAMETERS, np.r_[np.exp(theta[0]), theta[1:]]))
+    np.testing.assert_allclose(np.exp(calibration.design_matrix(drivers) @ theta), model.predict(drivers, params))
+
+
+def test_unpenalised_solve_is_least_squares():
+    X, y, _ = _problem()
+    zero = np.zeros((X.shape[1], X.shape[1]))
+    expected, *_ = np.linalg.lstsq(X, y, rcond=None)
+    np.testing.assert_allclose(calibration._solve(X, y, zero, calibration._prior()), expected, rtol=1e-6)
+
+
+def test_pinned_slope_stays_at_prior():
+    X, y, _ = _problem()
+    X[:, 3] = X[0, 3]  # salinity never varies
+    theta = calibration._solve(X, y, calibration._penalty(X), calibration._prior())
+    np.testing.assert_allclose(theta[3], calibration._prior()[3])
+
+
+def test_bootstrap_does_not_depend_on_workers():
+    X, y, _ = _problem()
+    args = (X, y, calibration._penalty(X), calibration._prior())
+    serial = calibration.bootstrap(*args, replicates=250, workers=1, batch_size=100, seed=3)
+    parallel = calibration.bootstrap(*args, replicates=250, workers=2, batch_size=100, seed=3)
+    assert serial.shape == (250, len(model.PARAMETERS))
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_fill_values_fall_back_to_the_table_1_midpoint():
+    species = model.SPECIES[0]
+    observations = pd.DataFrame({name: [1.0, 2.0, 9.0] for name in model.DRIVERS}).assign(TOC=np.nan)
+    values = calibration.fill_values(species, observations)
+    assert values["temp"] == 2.0
+    assert values["TOC"] == np.mean(model.SPECIES_RANGES[species]["TOC"])
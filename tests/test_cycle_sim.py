@@ -0,0 +1,27 @@
+import numpy as np
+
+import cycle_sim
+import model
+
+BASE = {"temp": 27.0, "TOC": 15.0, "salinity": 10.0, "nitrogen": 100.0, "DO": 5.0, "pH": 7.5}
+
+
+def test_constant_drivers_accumulate_flux_times_days():
+    drivers = {name: np.full((3, 10), value) for name, value in BASE.items()}
+    totals, trajectory = cycle_sim.simulate(drivers, dt_days=0.5)
+    flux = float(model.predict(BASE))
+    np.testing.assert_allclose(totals, flux * 5.0)
+    np.testing.assert_allclose(trajectory[0], flux * 0.5 * np.arange(1, 11))
+
+
+def test_blocks_and_memory_maps_give_the_same_result(tmp_path, monkeypatch):
+    drivers = cycle_sim.scenario_drivers(BASE, ponds=50, days=30)
+    totals, trajectory = cycle_sim.simulate(drivers)
+    np.testing.assert_allclose(totals, trajectory[:, -1])
+
+    # Blocks of 7 ponds, with the trajectory written to a memory-mapped file
+    monkeypatch.setattr(cycle_sim, "CHUNK_CELLS", 7 * 30)
+    output = cycle_sim.open_array(tmp_path / "trajectory.npy", (50, 30), "w+")
+    blocked_totals, _ = cycle_sim.simulate(drivers, trajectory=output)
+    np.testing.assert_allclose(blocked_totals, totals)
+    np.testing.assert_allclose(np.load(tmp_path / "trajectory.npy"), trajectory)
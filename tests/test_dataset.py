@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+import dataset
+
+
+def test_driver_values_parse_sum_and_mask():
+    frame = pd.DataFrame({
+        "Temperature": ["25", "n/a", 50.0],
+        "TOC": [10.0, 43_200.0, np.nan],
+        "Salinity%": [5.0, 6.0, 7.0],
+        "Ammonia": [100.0, np.nan, np.nan],
+        "Nitrite": [20.0, np.nan, 5.0],
+        "Nitrate": [np.nan, np.nan, 1.0],
+        "DO": [5.0, 6.0, 7.0],
+        "pH": [7.5, 3.0, 8.0],
+    })
+    drivers = dataset.driver_values(frame)
+    assert list(drivers.columns) == list(dataset.DRIVER_COLUMNS)
+    assert drivers["temp"].tolist()[0] == 25.0 and drivers["temp"].isna().tolist()[1:] == [True, True]
+    assert drivers["TOC"].isna().tolist() == [False, True, True]
+    # Nitrogen is the sum of the reported species; nothing reported stays missing, 6 µg/L is implausibly low
+    assert drivers["nitrogen"].tolist()[0] == 120.0 and drivers["nitrogen"].isna().tolist()[1:] == [True, True]
+    assert drivers["pH"].isna().tolist() == [False, True, False]
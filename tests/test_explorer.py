@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import explorer
+
+FRAME = pd.DataFrame({
+    "ScientificName": ["Penaeus monodon", "Penaeus monodon ", "Eriocheir sinensis", "Eriocheir sinensis", None],
+    "Country": ["China", "India", "China", "China", "India"],
+    "Year": [2020, 2021, 2020, 2022, 2021],
+    "System": ["Ponds", "Ponds", "Ponds", "Rice", "Ponds"],
+    "Study_ID": [1, 2, 3, 3, 4],
+    "DOI": ["a", "b", "c", "c", np.nan],
+    "CH4": [10.0, 20.0, 30.0, np.nan, 50.0],
+    "Temperature": [25.0, 28.0, 20.0, 22.0, 30.0],
+    # 43,200 is sediment TOC in mg/kg, outside the plausible water range
+    "TOC": [10.0, 43_200.0, 12.0, 14.0, 8.0],
+    "Salinity%": [10.0, 12.0, 1.0, 2.0, 15.0],
+    "Ammonia": [100.0, 50.0, np.nan, 20.0, 40.0],
+    "Nitrite": [10.0, np.nan, np.nan, 5.0, 4.0],
+    "Nitrate": [np.nan, 25.0, np.nan, 15.0, 6.0],
+    "DO": [5.0, 6.0, 7.0, 8.0, 4.0],
+    "pH": [7.5, 8.0, 7.8, 7.6, 8.1],
+})
+
+
+def test_mask_matches_any_value_in_every_dimension():
+    data = explorer.Explorer(FRAME)
+    assert data.mask().all()
+    assert data.mask({"country": ["China"]}).tolist() == [True, False, True, True, False]
+    # Species names are stripped; a row with no species never matches a species filter
+    assert data.mask({"species": ["Penaeus monodon"], "country": ["China", "India"]}).tolist() == [True, True, False, False, False]
+    assert data.mask({"species": [], "year": [2021]}).tolist() == [False, True, False, False, True]
+
+
+def test_aggregate_counts_studies_measurements_and_mean_flux():
+    result = explorer.Explorer(FRAME).aggregate("country")
+    assert result.loc["China"].tolist() == [2, 3, 20.0]
+    assert result.loc["India"].tolist() == [2, 2, 35.0]
+
+    by_year = explorer.Explorer(FRAME).aggregate("year", {"country": ["China"]})
+    assert by_year.index.tolist() == [2020, 2022]
+    assert np.isnan(by_year.loc[2022, "mean_flux"])
+
+
+def test_references_are_distinct_dois_in_sheet_order():
+    assert explorer.Explorer(FRAME).references({"country": ["China"]}) == ["a", "c"]
+
+
+def test_scatter_drops_out_of_range_driver_values():
+    points = explorer.Explorer(FRAME).scatter("TOC")
+    assert points["TOC"].tolist() == [10.0, 12.0, 8.0]
+    assert points["CH4"].tolist() == [10.0, 30.0, 50.0]
+
+
+def test_scatter_thins_to_max_points():
+    frame = pd.concat([FRAME] * 200, ignore_index=True)
+    frame["Temperature"] = np.linspace(1, 40, len(frame))
+    assert len(explorer.Explorer(frame).scatter("temp", max_points=100)) <= 100
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import inventory
+import model
+
+PARAMS = {species: model.DEFAULT_PARAMS for species in model.SPECIES}
+SPECIES = model.SPECIES[0]
+CONDITIONS = pd.DataFrame(
+    {"temp": [30.0], "TOC": [10.0], "salinity": [np.nan], "nitrogen": [200.0], "DO": [6.0], "pH": [8.0]},
+    index=pd.MultiIndex.from_tuples([("China", SPECIES)], names=["Country", "Species"]),
+)
+FILLS = {species: {name: 1.0 for name in model.DRIVERS} for species in model.SPECIES}
+
+
+def _inventory(production, scenarios=None):
+    return inventory.inventory(production, scenarios=scenarios, params=PARAMS, conditions=CONDITIONS, fills=FILLS)
+
+
+def test_emission_follows_area_and_flux():
+    table = _inventory(pd.DataFrame({"Country": ["China"], "Species": [SPECIES], "tonnes": [1_000.0]}), {"Current practice": {}})
+    row = table.iloc[0]
+    assumptions = inventory.ASSUMPTIONS.loc[SPECIES]
+    yield_t_ha = assumptions["stocking_density"] * 1e4 * assumptions["survival"] * assumptions["harvest_weight_g"] / 1e6
+    assert row["area_ha"] == pytest.approx(1_000 / (yield_t_ha * assumptions["cycles_per_year"]))
+    assert row["flux"] == pytest.approx(float(model.predict({**CONDITIONS.iloc[0], "salinity": 1.0})))
+    days = np.mean(model.SPECIES_CYCLE_DAYS[SPECIES])
+    expected = row["flux"] * model.MG_M2_TO_KG_HA * days * assumptions["cycles_per_year"] * row["area_ha"] / 1000
+    assert row["emission_t"] == pytest.approx(expected)
+
+
+def test_missing_drivers_are_filled_and_listed():
+    production = pd.DataFrame({"Country": ["China", "Peru"], "Species": [SPECIES, SPECIES], "tonnes": [1.0, 1.0]})
+    table = _inventory(production, {"Current practice": {}})
+    assert table["imputed"].tolist() == ["salinity", ", ".join(model.DRIVERS)]
+    assert table.loc[1, list(model.DRIVERS)].tolist() == [1.0] * len(model.DRIVERS)
+
+
+def test_scenarios_adjust_the_drivers():
+    production = pd.DataFrame({"Country": ["China"], "Species": [SPECIES], "tonnes": [1.0]})
+    table = _inventory(production, {"Current practice": {}, "Aeration": {"DO": (1.0, 2.0)}}).set_index("Scenario")
+    assert table.loc["Aeration", "DO"] == table.loc["Current practice", "DO"] + 2.0
+
+
+def test_empty_production_gives_an_empty_inventory():
+    table = _inventory(inventory.PRODUCTION.iloc[:0])
+    assert table.empty
+    assert inventory.national_totals(table).empty
@@ -0,0 +1,23 @@
+import numpy as np
+
+import model
+
+FIXED = {"temp": 27.0, "TOC": 15.0, "salinity": 10.0, "nitrogen": 100.0, "DO": 5.0, "pH": 7.5}
+
+
+def test_chunked_sweep_matches_pointwise_evaluation():
+    temp, toc = np.linspace(1, 40, 7), np.linspace(5, 30, 5)
+    grid = model.sweep({"temp": temp, "TOC": toc}, FIXED, chunk_cells=6)
+
+    expected = [[model.predict({**FIXED, "temp": t, "TOC": c}) for c in toc] for t in temp]
+    assert grid.shape == (7, 5)
+    np.testing.assert_allclose(grid, expected)
+
+
+def test_sweep_of_empty_grid_is_empty():
+    fixed = {name: value for name, value in FIXED.items() if name != "temp"}
+    assert model.sweep({"temp": []}, fixed).shape == (0,)
+
+
+def test_sweep_without_grids_is_the_fixed_prediction():
+    np.testing.assert_allclose(model.sweep({}, FIXED), model.predict(FIXED))
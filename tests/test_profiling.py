@@ -0,0 +1,30 @@
+import tracemalloc
+
+import profiling
+
+
+def test_nested_sections_are_recorded_in_finishing_order():
+    profiler = profiling.Profiler()
+    with profiler.section("outer"):
+        with profiler.section("inner"):
+            pass
+    assert profiler.table().index.tolist() == ["inner", "outer"]
+    assert profiler.records["outer"]["wall_ms"] >= profiler.records["inner"]["wall_ms"]
+
+
+def test_memory_tracing_stops_with_the_outermost_section():
+    profiler = profiling.Profiler(memory=True)
+    with profiler.section("outer"):
+        with profiler.section("inner"):
+            data = bytearray(4 << 20)
+        del data
+    assert not tracemalloc.is_tracing()
+    assert profiler.records["inner"]["peak_mb"] >= 4
+    assert profiler.records["outer"]["peak_mb"] >= profiler.records["inner"]["peak_mb"]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = profiling.Profiler(enabled=False)
+    with profiler.section("skipped"):
+        pass
+    assert profiler.records == {}
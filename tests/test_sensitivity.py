@@ -0,0 +1,26 @@
+import numpy as np
+
+import model
+import sensitivity
+
+# Only temperature moves the flux: every other slope is zero
+TEMP_ONLY = {"alpha": 1.0, "beta_1": 0.1, "beta_2": 0.0, "beta_3": 0.0, "beta_4": 0.0, "beta_5": 0.0, "beta_6": 0.0}
+RANGES = model.SPECIES_RANGES[model.SPECIES[0]]
+
+
+def test_sobol_with_one_active_driver():
+    indices = sensitivity.sobol(RANGES, TEMP_ONLY, samples=20_000, workers=1)
+    np.testing.assert_allclose(indices.loc["temp"], [1.0, 1.0], atol=0.05)
+    np.testing.assert_allclose(indices.drop("temp"), 0.0, atol=1e-12)
+
+
+def test_sobol_does_not_depend_on_workers():
+    serial = sensitivity.sobol(RANGES, samples=2 * sensitivity.BLOCK_SAMPLES, workers=1)
+    parallel = sensitivity.sobol(RANGES, samples=2 * sensitivity.BLOCK_SAMPLES, workers=2)
+    np.testing.assert_allclose(serial, parallel)
+
+
+def test_morris_with_one_active_driver():
+    effects = sensitivity.morris(RANGES, TEMP_ONLY, trajectories=100)
+    assert effects.loc["temp", "mu_star"] > 0
+    np.testing.assert_allclose(effects.drop("temp"), 0.0, atol=1e-12)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+import model
+import service
+
+ROW = {"temp": 27, "TOC": 15, "salinity": 10, "nitrogen": 100, "DO": 5, "pH": 7.5}
+
+
+def _route(requests, max_wait_ms=20):
+    """Send ``(path, payload)`` requests concurrently; returns their (status, response) and the batch sizes."""
+    async def run():
+        server = service.ScoringServer(max_wait_ms=max_wait_ms)
+        server.batcher.start()
+        try:
+            results = await asyncio.gather(*(server.route("POST", path, json.dumps(payload).encode()) for path, payload in requests))
+        finally:
+            await server.batcher.stop()
+        return results, list(server.metrics.batch_sizes)
+
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_share_a_batch_and_get_their_own_rows():
+    temps = [[20.0, 25.0], [30.0], [15.0, 18.0, 35.0]]
+    results, batches = _route([("/predict/batch", {**ROW, "temp": temp}) for temp in temps])
+
+    assert batches == [6]
+    for temp, (status, response) in zip(temps, results):
+        assert status == 200
+        np.testing.assert_allclose(response["methane_flux"], model.predict({**ROW, "temp": np.array(temp)}))
+
+
+def test_failing_request_does_not_fail_its_batch(monkeypatch):
+    predict = model.predict
+
+    def fails_at_13(drivers, params=None):
+        if np.any(drivers["temp"] == 13):
+            raise RuntimeError("boom")
+        return predict(drivers, params)
+
+    monkeypatch.setattr(model, "predict", fails_at_13)
+    results, _ = _route([("/predict", {**ROW, "temp": temp}) for temp in (27, 13, 28)])
+    assert [status for status, _ in results] == [200, 500, 200]
+    assert results[0][1]["methane_flux"] == pytest.approx(predict(ROW))
+
+
+def test_non_finite_predictions_are_null():
+    # Python's json reads NaN, so a NaN driver reaches the model
+    results, _ = _route([("/predict/batch", {**ROW, "temp": [27, float("nan")]})])
+    status, response = results[0]
+    assert status == 200
+    assert response["methane_flux"][0] == pytest.approx(float(model.predict(ROW)))
+    assert response["methane_flux"][1] is None
+
+
+@pytest.mark.parametrize("payload", [
+    {**ROW, "temp": True},
+    {**ROW, "TOC": "15"},
+    {**ROW, "temp": [[20, 25]]},
+    {"rows": [ROW, {**ROW, "pH": [7.5]}]},
+    {key: value for key, value in ROW.items() if key != "DO"},
+    {**ROW, "temp": [20, 25, 30], "pH": [7.5, 8.0]},
+])
+def test_invalid_drivers_are_rejected(payload):
+    with pytest.raises(service.RequestError):
+        service._columns(payload)
+
+
+def test_routes_report_client_errors():
+    results, _ = _route([
+        ("/predict", {**ROW, "temp": [20, 25]}),
+        ("/predict", {**ROW, "species": "Homarus gammarus"}),
+        ("/predict/batch", {"rows": [ROW, ROW]}),
+    ])
+    assert [status for status, _ in results] == [400, 400, 200]
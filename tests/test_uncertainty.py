@@ -0,0 +1,32 @@
+import numpy as np
+
+import model
+import uncertainty
+
+DRIVERS = {"temp": 27.0, "TOC": 15.0, "salinity": 10.0, "nitrogen": 100.0, "DO": 5.0, "pH": 7.5}
+X_VALUES = np.linspace(10, 35, 6)
+
+
+def test_bands_do_not_depend_on_workers():
+    cov = uncertainty.parameter_covariance(model.DEFAULT_PARAMS)
+    # A small memory budget splits the draws over several chunks
+    args = ("temp", X_VALUES, DRIVERS, model.DEFAULT_PARAMS, cov, 0.05, 20_000)
+    serial = uncertainty.simulate_bands(*args, seed=4, workers=1, memory_mb=1)
+    parallel = uncertainty.simulate_bands(*args, seed=4, workers=3, memory_mb=1)
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_bands_without_uncertainty_collapse_to_the_prediction():
+    cov = np.zeros((len(model.PARAMETERS), len(model.PARAMETERS)))
+    low, median, high = uncertainty.simulate_bands("temp", X_VALUES, DRIVERS, model.DEFAULT_PARAMS, cov, 0.0, 1_000, workers=1)
+    expected = model.predict({**DRIVERS, "temp": X_VALUES})
+    for band in (low, median, high):
+        np.testing.assert_allclose(band, expected, rtol=1e-2)
+
+
+def test_bands_are_ordered_and_bracket_the_prediction():
+    cov = uncertainty.parameter_covariance(model.DEFAULT_PARAMS)
+    low, median, high = uncertainty.simulate_bands("temp", X_VALUES, DRIVERS, model.DEFAULT_PARAMS, cov, 0.05, 20_000, workers=1)
+    expected = model.predict({**DRIVERS, "temp": X_VALUES})
+    assert np.all(low < median) and np.all(median < high)
+    assert np.all(low < expected) and np.all(expected < high)
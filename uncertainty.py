@@ -0,0 +1,118 @@
+"""Monte Carlo uncertainty bands for the methane emission model.
+
+Each draw samples the model parameters jointly from a multivariate normal over
+(log α, β₁ … β₆), so α stays positive and the strong correlation between the
+intercept and the slopes is kept, perturbs the fixed drivers with relative
+measurement noise, then evaluates the model along the swept x values. Draws
+are generated in chunks sized to a memory budget and spread over worker
+processes; each worker only returns a histogram of log₁₀ flux per x value, so
+millions of draws are reduced to percentiles without ever being held in memory
+at once.
+
+Every chunk has its own seed spawned from ``seed``, so results do not depend
+on the number of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import model
+
+# Histogram resolution for the percentile estimate (bins per x value)
+BINS = 4096
+
+# Draws used to pick the histogram range before the main run
+PILOT_DRAWS = 10_000
+
+# Relative standard deviation assumed for the default (uncalibrated) parameters
+DEFAULT_PARAM_RELATIVE_SD = 0.1
+
+
+def parameter_covariance(params, cov=None):
+    """Covariance of (log α, β₁ … β₆), in model.PARAMETERS order.
+
+    ``cov`` is the bootstrap covariance stored by calibration.fit_species().
+    Without it the parameters are taken as independent, each with
+    DEFAULT_PARAM_RELATIVE_SD of its value (of log α itself for α).
+    """
+    if cov is not None:
+        return np.asarray(cov, dtype=float)
+    sd = [DEFAULT_PARAM_RELATIVE_SD * abs(params[name]) for name in model.PARAMETERS]
+    sd[0] = DEFAULT_PARAM_RELATIVE_SD
+    return np.diag(np.square(sd))
+
+
+def _sample_log10_flux(x_driver, x_values, drivers, params, param_cov, input_rel_sd, draws, rng):
+    """Evaluate ``draws`` samples along ``x_values``; returns a ``(draws, len(x_values))`` array."""
+    mean = np.array([params[name] for name in model.PARAMETERS], dtype=float)
+    mean[0] = np.log(mean[0])
+    # eigh copes with the zero-variance rows of slopes the fit pinned to their prior
+    theta = rng.multivariate_normal(mean, param_cov, size=draws, method="eigh")
+    sampled = {name: theta[:, [i]] for i, name in enumerate(model.PARAMETERS)}
+    sampled["alpha"] = np.exp(sampled["alpha"])
+    for name in model.DRIVERS:
+        if name == x_driver:
+            sampled[name] = np.asarray(x_values, dtype=float)[None, :]
+        else:
+            noise = 1 + input_rel_sd * rng.standard_normal((draws, 1))
+            sampled[name] = np.clip(drivers[name] * noise, 0, None)
+    with np.errstate(over="ignore", divide="ignore"):
+        return np.log10(model.methane_emission_model(**sampled))
+
+
+def _histogram_task(args, chunks, edges):
+    x_driver, x_values, drivers, params, param_cov, input_rel_sd = args
+    low, high = edges
+    n_x = len(x_values)
+    counts = np.zeros(n_x * BINS, dtype=np.int64)
+    offsets = np.arange(n_x) * BINS
+    for draws, seed in chunks:
+        values = _sample_log10_flux(x_driver, x_values, drivers, params, param_cov, input_rel_sd, draws, np.random.default_rng(seed))
+        values = np.nan_to_num(values, nan=high, posinf=high, neginf=low)
+        index = np.clip(((values - low) / (high - low) * BINS).astype(np.int64), 0, BINS - 1)
+        counts += np.bincount((index + offsets).ravel(), minlength=n_x * BINS)
+    return counts.reshape(n_x, BINS)
+
+
+def simulate_bands(x_driver, x_values, drivers, params, param_cov, input_rel_sd=0.05, draws=1_000_000,
+                   percentiles=(5, 50, 95), seed=0, workers=None, memory_mb=64):
+    """Percentiles of the predicted flux at each x value, shape ``(len(percentiles), len(x_values))``.
+
+    ``drivers`` holds the fixed driver values (the ``x_driver`` entry is ignored)
+    and ``param_cov`` comes from parameter_covariance(). Each chunk of draws is kept
+    under roughly ``memory_mb`` of temporaries.
+    """
+    x_values = np.asarray(x_values, dtype=float)
+    args = (x_driver, x_values, dict(drivers), dict(params), np.asarray(param_cov, dtype=float), input_rel_sd)
+
+    # ~4 float64 temporaries per evaluated cell
+    chunk = max(1, (memory_mb << 20) // (4 * 8 * len(x_values)))
+    sizes = [min(chunk, draws - start) for start in range(0, draws, chunk)]
+    pilot_seed, *chunk_seeds = np.random.SeedSequence(seed).spawn(1 + len(sizes))
+    chunks = list(zip(sizes, chunk_seeds))
+
+    # Histogram range from a pilot run, padded so the tails of the full run still land inside
+    pilot = _sample_log10_flux(*args, min(draws, PILOT_DRAWS), np.random.default_rng(pilot_seed))
+    pilot = pilot[np.isfinite(pilot)]
+    low, high = (float(pilot.min()), float(pilot.max())) if pilot.size else (-10.0, 10.0)
+    pad = max(high - low, 1.0) * 0.5
+    edges = (low - pad, high + pad)
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers == 1:
+        counts = _histogram_task(args, chunks, edges)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_histogram_task, args, chunks[i::workers], edges) for i in range(workers)]
+            counts = sum(future.result() for future in futures)
+
+    # Percentile = interpolated position in the cumulative histogram, back on the flux scale
+    cumulative = np.cumsum(counts, axis=1) / counts.sum(axis=1, keepdims=True)
+    upper_edges = np.linspace(*edges, BINS + 1)[1:]
+    bands = np.empty((len(percentiles), len(x_values)))
+    for i, q in enumerate(percentiles):
+        for j in range(len(x_values)):
+            bands[i, j] = np.interp(q / 100, cumulative[j], upper_edges)
+    return 10 ** bands